@@ -56,6 +56,13 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'tracker.throttling.UserEndpointTokenBucketThrottle',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'tracker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 AUTH_USER_MODEL = 'tracker.User'
@@ -63,6 +70,8 @@ AUTH_USER_MODEL = 'tracker.User'
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'tracker.middleware.CompressionMiddleware',
+    'tracker.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -109,6 +118,20 @@ DATABASES = {
     )
 }
 
+# Cache for throttle buckets, the search index version, the archive horizon and analytics reports.
+# The default is per process: each worker keeps its own throttle buckets and only notices catalog and
+# archive changes made in that process (see README). Set CACHE_BACKEND/CACHE_LOCATION to Redis or
+# Memcached to share them across workers. Not the database cache: throttling touches it on every request.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+if CACHES["default"]["BACKEND"] == "django.core.cache.backends.locmem.LocMemCache":
+    # Culled by a third once it passes MAX_ENTRIES (default 300); leave room for a bucket per client
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=100000, cast=int)}
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -144,4 +167,40 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
-STATIC_ROOT = BASE_DIR / "staticfiles"
\ No newline at end of file
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Population analytics (tracker.analytics): seconds a report stays cached per reporting window
+ANALYTICS_CACHE_SECONDS = config("ANALYTICS_CACHE_SECONDS", default=3600, cast=int)
+
+
+# Protein source search index (tracker.search): max age in seconds before a rebuild
+SOURCE_SEARCH_INDEX_TTL = config("SOURCE_SEARCH_INDEX_TTL", default=300, cast=int)
+# ... and how often, in seconds, each process checks the cache for another process's catalog change
+SOURCE_SEARCH_VERSION_CHECK_SECONDS = config("SOURCE_SEARCH_VERSION_CHECK_SECONDS", default=5, cast=int)
+
+
+# OpenAPI schema artifacts written by build.sh and served by tracker.schema.schema_view, per format
+OPENAPI_SCHEMA_FILES = {
+    "yaml": BASE_DIR / "openapi-schema.yaml",
+    "json": BASE_DIR / "openapi-schema.json",
+}
+
+
+# Response compression (tracker.middleware.CompressionMiddleware)
+RESPONSE_COMPRESSION_MIN_BYTES = config("RESPONSE_COMPRESSION_MIN_BYTES", default=1024, cast=int)
+RESPONSE_COMPRESSION_BROTLI_QUALITY = config("RESPONSE_COMPRESSION_BROTLI_QUALITY", default=5, cast=int)
+
+
+# Token-bucket throttles (tracker.throttling): scope -> (capacity in tokens, refill in tokens/second).
+# Requests cost 1 token unless the view weights them (see throttle_costs on the views).
+THROTTLE_BUCKETS = {
+    "user": (600, 10.0),
+    "endpoint": (200, 3.0),
+}
+
+# Load shedding (tracker.middleware.AdmissionControlMiddleware); 0 disables a check
+ADMISSION_CONTROL_PATH_PREFIX = "/api/"
+ADMISSION_MAX_IN_FLIGHT = config("ADMISSION_MAX_IN_FLIGHT", default=64, cast=int)
+ADMISSION_DB_LATENCY_MS = config("ADMISSION_DB_LATENCY_MS", default=500, cast=float)
+ADMISSION_DB_LATENCY_HALF_LIFE = config("ADMISSION_DB_LATENCY_HALF_LIFE", default=5, cast=float)
+ADMISSION_RETRY_AFTER_SECONDS = config("ADMISSION_RETRY_AFTER_SECONDS", default=2, cast=int)
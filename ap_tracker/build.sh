@@ -6,5 +6,9 @@ pip install -r requirements.txt
 # Collect static files
 python manage.py collectstatic --noinput
 
+# Pre-generate the OpenAPI schema served at /api/schema/ (YAML by default, JSON on request)
+python manage.py spectacular --format openapi --file openapi-schema.yaml
+python manage.py spectacular --format openapi-json --file openapi-schema.json
+
 # Apply database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
@@ -1,26 +1,119 @@
+from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth import get_user_model
-from .models import AnimalProteinSource, ProteinIntake, DailyProteinTarget, IntakeSummary
+from django.core.exceptions import ValidationError
+from .units import format_hundredths, to_hundredths
+from .models import AnimalProteinSource, ProteinIntake, DailyProteinTarget, IntakeSummary, ArchivedProteinIntake, UserAdherenceStats, AdherenceDistribution, IntakeRollup
 
 User = get_user_model()
 
+
+class HundredthsFormField(forms.DecimalField):
+    """
+    Admin counterpart of serializers.HundredthsField: edits an integer model
+    field holding hundredths (7055) as a 2-decimal-place value ("70.55").
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", 5)
+        kwargs.setdefault("min_value", 0)
+        super().__init__(decimal_places=2, **kwargs)
+
+    def prepare_value(self, value):
+        # The model's int on first display; the submitted text when redisplaying a form with errors
+        return format_hundredths(value) if isinstance(value, int) else value
+
+    def clean(self, value):
+        # Validated as a decimal (digits, 2 places, minimum) before it becomes hundredths
+        value = super().clean(value)
+        return None if value is None else to_hundredths(value)
+
+    def has_changed(self, initial, data):
+        try:
+            return self.clean(data) != initial
+        except ValidationError:
+            return True
+
+
+class UserChangeForm(BaseUserAdmin.form):
+    weight_dag = HundredthsFormField(label="Weight (kg)", required=False)
+
+
+class UserCreationForm(BaseUserAdmin.add_form):
+    weight_dag = HundredthsFormField(label="Weight (kg)", required=False)
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
+    form = UserChangeForm
+    add_form = UserCreationForm
+
     # Show weight_kg in the user list page
     list_display = BaseUserAdmin.list_display + ("weight_kg",)
 
-    # Add weight_kg to the user edit page
+    # Add the weight (stored in hundredths of a kg, edited in kg) to the user edit page
     fieldsets = BaseUserAdmin.fieldsets + (
-        ("Health Info", {"fields": ("weight_kg",)}),
+        ("Health Info", {"fields": ("weight_dag",)}),
     )
 
-    # Add weight_kg to the "Add user" page too
+    # Add it to the "Add user" page too
     add_fieldsets = BaseUserAdmin.add_fieldsets + (
-        ("Health Info", {"fields": ("weight_kg",)}),
+        ("Health Info", {"fields": ("weight_dag",)}),
     )
 
+    @admin.display(description="Weight (kg)", ordering="weight_dag")
+    def weight_kg(self, obj):
+        return format_hundredths(obj.weight_dag) if obj.weight_dag is not None else None
+
+
+# Centigram fields are edited in grams, with the same limits as the API
+class ProteinIntakeForm(forms.ModelForm):
+    protein_quantity_cg = HundredthsFormField(label="Protein quantity (g)")
+
+
+class DailyProteinTargetForm(forms.ModelForm):
+    target_cg = HundredthsFormField(label="Target (g)")
+
+
+class IntakeSummaryForm(forms.ModelForm):
+    total_protein_cg = HundredthsFormField(label="Total protein (g)", max_digits=9)
+    target_protein_cg = HundredthsFormField(label="Target protein (g)", max_digits=9)
+
+
+class UserAdherenceStatsForm(forms.ModelForm):
+    window_7_total_cg = HundredthsFormField(label="Window 7 total (g)", max_digits=12)
+    window_30_total_cg = HundredthsFormField(label="Window 30 total (g)", max_digits=12)
+
+
+class IntakeRollupForm(forms.ModelForm):
+    total_protein_cg = HundredthsFormField(label="Total protein (g)", max_digits=12)
+    total_target_cg = HundredthsFormField(label="Total target (g)", max_digits=12)
+
+
+@admin.register(ProteinIntake, ArchivedProteinIntake)
+class ProteinIntakeAdmin(admin.ModelAdmin):
+    form = ProteinIntakeForm
+
+
+@admin.register(DailyProteinTarget)
+class DailyProteinTargetAdmin(admin.ModelAdmin):
+    form = DailyProteinTargetForm
+
+
+@admin.register(IntakeSummary)
+class IntakeSummaryAdmin(admin.ModelAdmin):
+    form = IntakeSummaryForm
+
+
+@admin.register(UserAdherenceStats)
+class UserAdherenceStatsAdmin(admin.ModelAdmin):
+    form = UserAdherenceStatsForm
+
+
+@admin.register(IntakeRollup)
+class IntakeRollupAdmin(admin.ModelAdmin):
+    form = IntakeRollupForm
+
+
 admin.site.register(AnimalProteinSource)
-admin.site.register(ProteinIntake)
-admin.site.register(DailyProteinTarget)
-admin.site.register(IntakeSummary)
\ No newline at end of file
+admin.site.register(AdherenceDistribution)
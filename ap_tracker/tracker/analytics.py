@@ -0,0 +1,276 @@
+"""
+Population-level reports for the nutrition team.
+
+Each report streams the columns it needs out of the database in chunks
+(values_list + iterator) and folds every chunk into fixed-size NumPy
+accumulators, so memory is bounded by the chunk size, not the row count.
+"""
+from bisect import bisect_right
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+
+from .models import ProteinIntake, ArchivedProteinIntake, IntakeSummary, AdherenceDistribution
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Per-intake quantities are capped at 999.99 g by the API, so 5 g bins cover everything
+QUANTITY_BIN_EDGES = np.arange(0, 1005, 5, dtype=np.float64)
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+# Body-weight bands in kg; the last band is open-ended
+WEIGHT_BAND_EDGES = (50, 60, 70, 80, 90, 100, 120)
+
+# Per-user adherence buckets, one percentage point wide; the last bucket holds exactly 100%
+ADHERENCE_BUCKET_EDGES = tuple(range(0, 102))
+
+ON_TARGET = Q(total_protein_cg__gte=F("target_protein_cg"))
+
+
+def _chunks(queryset, fields, chunk_size):
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _column(chunk, index, dtype=np.float64):
+    # int / None -> float (NaN for NULL), one pass over the chunk
+    return np.fromiter(
+        (np.nan if row[index] is None else row[index] for row in chunk),
+        dtype=dtype,
+        count=len(chunk),
+    )
+
+
+def _hundredths(chunk, index):
+    # Integer centigrams (or hundredths of a kg) -> grams (kg) as floats
+    return _column(chunk, index) / 100
+
+
+def _grow(array, size):
+    # Zero-pad an accumulator along its first axis
+    if array.shape[0] >= size:
+        return array
+    padding = [(0, size - array.shape[0])] + [(0, 0)] * (array.ndim - 1)
+    return np.pad(array, padding)
+
+
+def _histogram_quantiles(counts, edges, quantiles=QUANTILES):
+    """
+    Approximate quantiles from a histogram by linear interpolation inside the bin.
+    """
+    total = counts.sum()
+    if not total:
+        return {str(q): None for q in quantiles}
+    cumulative = np.cumsum(counts)
+    result = {}
+    for q in quantiles:
+        rank = q * total
+        i = int(np.searchsorted(cumulative, rank))
+        before = cumulative[i - 1] if i else 0
+        fraction = (rank - before) / counts[i] if counts[i] else 0
+        result[str(q)] = round(float(edges[i] + fraction * (edges[i + 1] - edges[i])), 2)
+    return result
+
+
+def intake_by_category(start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Total, mean and quantiles of logged quantities, grouped by AnimalProteinSource.category.
+    """
+    n_bins = len(QUANTITY_BIN_EDGES) - 1
+    codes = {}
+    totals = np.zeros(0)
+    counts = np.zeros(0, dtype=np.int64)
+    histograms = np.zeros((0, n_bins), dtype=np.int64)
+
+    # Old windows may live partly or wholly in the archive table
+    querysets = [model.objects.filter(intake_date__range=(start, end)) for model in (ProteinIntake, ArchivedProteinIntake)]
+    fields = ["protein_source__category", "protein_quantity_cg"]
+    for chunk in (chunk for queryset in querysets for chunk in _chunks(queryset, fields, chunk_size)):
+        category = np.fromiter((codes.setdefault(row[0], len(codes)) for row in chunk), dtype=np.int64, count=len(chunk))
+        quantity = _hundredths(chunk, 1)
+        bins = np.clip(np.searchsorted(QUANTITY_BIN_EDGES, quantity, side="right") - 1, 0, n_bins - 1)
+
+        size = len(codes)
+        totals = _grow(totals, size) + np.bincount(category, weights=quantity, minlength=size)
+        counts = _grow(counts, size) + np.bincount(category, minlength=size)
+        histograms = _grow(histograms, size) + np.bincount(
+            category * n_bins + bins, minlength=size * n_bins
+        ).reshape(size, n_bins)
+
+    report = {}
+    for name, code in sorted(codes.items()):
+        report[name] = {
+            "intakes": int(counts[code]),
+            "total_grams": round(float(totals[code]), 2),
+            "mean_grams": round(float(totals[code] / counts[code]), 2),
+            "quantiles_grams": _histogram_quantiles(histograms[code], QUANTITY_BIN_EDGES),
+        }
+    return report
+
+
+def target_adherence(start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Share of user-days on target, and the distribution of per-user adherence (10% buckets).
+
+    Per-user (days, days on target) pairs are grouped in SQL, so each chunk
+    folds into scalar totals and a 10-bucket histogram.
+    """
+    user_days = user_hits = users = users_most_days = 0
+    buckets = np.zeros(10, dtype=np.int64)
+
+    per_user = (
+        IntakeSummary.objects
+        .filter(summary_date__range=(start, end))
+        .values("user_id")
+        .annotate(days=Count("id"), hits=Count("id", filter=ON_TARGET))
+        .order_by()
+    )
+    for chunk in _chunks(per_user, ["days", "hits"], chunk_size):
+        days = _column(chunk, 0, np.int64)
+        hits = _column(chunk, 1, np.int64)
+        adherence = hits / days
+
+        user_days += int(days.sum())
+        user_hits += int(hits.sum())
+        users += len(chunk)
+        users_most_days += int((adherence >= 0.5).sum())
+        buckets += np.bincount(np.minimum((adherence * 10).astype(np.int64), 9), minlength=10)
+
+    return {
+        "user_days": user_days,
+        "user_days_on_target_percent": round(100 * user_hits / user_days, 2) if user_days else None,
+        "users_tracked": users,
+        "users_on_target_most_days_percent": round(100 * (users_most_days / users), 2) if users else None,
+        "user_adherence_distribution": {
+            f"{10 * i}-{10 * i + 10}%": int(count) for i, count in enumerate(buckets)
+        },
+    }
+
+
+def intake_by_weight_band(start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Mean daily protein (and grams per kg of body weight) grouped by the user's weight band.
+    """
+    edges = np.array(WEIGHT_BAND_EDGES, dtype=np.float64)
+    labels = (
+        [f"<{WEIGHT_BAND_EDGES[0]}"]
+        + [f"{low}-{high}" for low, high in zip(WEIGHT_BAND_EDGES, WEIGHT_BAND_EDGES[1:])]
+        + [f">={WEIGHT_BAND_EDGES[-1]}", "unknown"]
+    )
+    unknown = len(labels) - 1
+    totals = np.zeros(len(labels))
+    per_kg = np.zeros(len(labels))
+    counts = np.zeros(len(labels), dtype=np.int64)
+
+    queryset = IntakeSummary.objects.filter(summary_date__range=(start, end))
+    for chunk in _chunks(queryset, ["user__weight_dag", "total_protein_cg"], chunk_size):
+        weight = _hundredths(chunk, 0)
+        total = _hundredths(chunk, 1)
+        known = ~np.isnan(weight) & (weight > 0)
+        band = np.where(known, np.searchsorted(edges, np.nan_to_num(weight), side="right"), unknown)
+        ratio = np.divide(total, weight, out=np.zeros_like(total), where=known)
+
+        totals += np.bincount(band, weights=total, minlength=len(labels))
+        per_kg += np.bincount(band, weights=ratio, minlength=len(labels))
+        counts += np.bincount(band, minlength=len(labels))
+
+    report = {}
+    for i, label in enumerate(labels):
+        if not counts[i]:
+            continue
+        report[label] = {
+            "user_days": int(counts[i]),
+            "mean_daily_grams": round(float(totals[i] / counts[i]), 2),
+            "mean_grams_per_kg": round(float(per_kg[i] / counts[i]), 2) if i != unknown else None,
+        }
+    return report
+
+
+def population_report(start, end, chunk_size=DEFAULT_CHUNK_SIZE, use_cache=True):
+    """
+    All population reports for the window [start, end], cached per window.
+    """
+    key = f"analytics:population:{start}:{end}"
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    report = {
+        "start": str(start),
+        "end": str(end),
+        "intake_by_category": intake_by_category(start, end, chunk_size),
+        "target_adherence": target_adherence(start, end, chunk_size),
+        "intake_by_weight_band": intake_by_weight_band(start, end, chunk_size),
+    }
+    cache.set(key, report, settings.ANALYTICS_CACHE_SECONDS)
+    return report
+
+
+def month_end(period_start):
+    return (period_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def refresh_adherence_distribution(period_start, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Rebuild the AdherenceDistribution for the month starting at period_start.
+
+    Per-user (days, days on target) pairs are grouped in SQL and streamed in
+    chunks into a fixed 101-bucket histogram, stored as cumulative counts.
+    """
+    edges = np.array(ADHERENCE_BUCKET_EDGES, dtype=np.float64)
+    n_buckets = len(ADHERENCE_BUCKET_EDGES) - 1
+    counts = np.zeros(n_buckets, dtype=np.int64)
+
+    per_user = (
+        IntakeSummary.objects
+        .filter(summary_date__range=(period_start, month_end(period_start)))
+        .values("user_id")
+        .annotate(days=Count("id"), hits=Count("id", filter=ON_TARGET))
+        .order_by()
+    )
+    for chunk in _chunks(per_user, ["days", "hits"], chunk_size):
+        adherence = 100 * _column(chunk, 1) / _column(chunk, 0)
+        bucket = np.searchsorted(edges, adherence, side="right") - 1
+        counts += np.bincount(bucket, minlength=n_buckets)
+
+    cumulative = np.cumsum(counts)
+    distribution, _ = AdherenceDistribution.objects.update_or_create(
+        period_start=period_start,
+        defaults={"users": int(cumulative[-1]), "cumulative_counts": cumulative.tolist()},
+    )
+    return distribution
+
+
+def user_adherence(user, period_start):
+    """
+    (days tracked, days on target) for one user in the month; at most 31 rows.
+    """
+    counts = IntakeSummary.objects.filter(
+        user=user, summary_date__range=(period_start, month_end(period_start))
+    ).aggregate(days=Count("id"), hits=Count("id", filter=ON_TARGET))
+    return counts["days"], counts["hits"]
+
+
+def adherence_percentile(distribution, adherence):
+    """
+    Percent of ranked users below `adherence` (mid-rank inside its bucket).
+
+    A binary search over the bucket edges plus two lookups in the cumulative
+    counts, so the cost does not depend on how many users were ranked.
+    """
+    if not distribution.users:
+        return None
+    cumulative = distribution.cumulative_counts
+    bucket = min(bisect_right(ADHERENCE_BUCKET_EDGES, adherence) - 1, len(cumulative) - 1)
+    below = cumulative[bucket - 1] if bucket else 0
+    same = cumulative[bucket] - below
+    return 100 * (below + same / 2) / distribution.users
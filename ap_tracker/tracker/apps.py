@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class TrackerConfig(AppConfig):
     name = 'tracker'
+
+    def ready(self):
+        # Registers the catalog signal receivers that invalidate the search index
+        from . import search  # noqa: F401
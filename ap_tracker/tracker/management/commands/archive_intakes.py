@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.services import archive_intakes_before
+
+
+class Command(BaseCommand):
+    help = "Move ProteinIntake rows older than N days into the archive table. IntakeSummary rows are kept."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, required=True, metavar="DAYS",
+                            help="Archive intakes whose intake_date is more than DAYS days ago.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows moved per transaction (default 1000).")
+
+    def handle(self, *args, **options):
+        days = options["older_than"]
+        batch_size = options["batch_size"]
+        if days < 1:
+            raise CommandError("--older-than must be at least 1 day.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        cutoff = timezone.localdate() - timedelta(days=days)
+        moved = archive_intakes_before(cutoff=cutoff, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} intake(s) dated before {cutoff}."))
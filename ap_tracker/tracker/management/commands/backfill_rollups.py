@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tracker.services import rebuild_rollups
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly and monthly IntakeRollup rows from IntakeSummary with grouped aggregates. Run once after migrating, or to repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", metavar="USERNAME", help="Only rebuild this user's rollups.")
+        parser.add_argument("--start", metavar="YYYY-MM-DD", help="Only rebuild periods overlapping this date or later.")
+        parser.add_argument("--end", metavar="YYYY-MM-DD", help="Only rebuild periods overlapping this date or earlier.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rollup rows inserted per query (default 1000).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        user = None
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        bounds = {}
+        for name in ("start", "end"):
+            if options[name]:
+                bounds[name] = parse_date(options[name])
+                if bounds[name] is None:
+                    raise CommandError(f"Invalid --{name}. Use YYYY-MM-DD.")
+
+        written = rebuild_rollups(user=user, batch_size=options["batch_size"], **bounds)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup row(s)."))
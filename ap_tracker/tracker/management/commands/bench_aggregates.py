@@ -0,0 +1,86 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, FloatField, Sum
+from django.db.models.functions import Cast
+from rest_framework import serializers
+
+from tracker.management.commands.bench_render import _best_of
+from tracker.models import AnimalProteinSource, ProteinIntake
+from tracker.serializers import HundredthsField
+
+User = get_user_model()
+
+# The pre-migration read path: the same values as DecimalField(5, 2) columns, converted to Decimal per row
+LEGACY_QUANTITY = Cast(Cast(F("protein_quantity_cg"), FloatField()) / 100, DecimalField(max_digits=5, decimal_places=2))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark integer centigram aggregation and serialization against the old Decimal path. "
+        "Seeds intakes inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000, help="Intake rows to seed (default 50000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is reported (default 5).")
+        parser.add_argument("--force", action="store_true", help="Run even when DEBUG is off.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Seeds rows into the configured database; run with DEBUG on or pass --force.")
+        rows, repeat = options["rows"], options["repeat"]
+
+        with transaction.atomic():
+            queryset = self._seed(rows)
+            self.stdout.write(f"{rows} intakes on {connection.vendor}, best of {repeat}")
+            self._compare("Grouped SUM per day (SQL)", repeat,
+                          lambda: list(queryset.values("intake_date").annotate(total=Sum("protein_quantity_cg")).order_by()),
+                          lambda: list(queryset.values("intake_date").annotate(total=Sum(LEGACY_QUANTITY)).order_by()))
+
+            ints = list(queryset.values_list("protein_quantity_cg", flat=True))
+            decimals = list(queryset.annotate(legacy=LEGACY_QUANTITY).values_list("legacy", flat=True))
+            self._compare("Stream one column", repeat,
+                          lambda: list(queryset.values_list("protein_quantity_cg", flat=True).iterator(chunk_size=5000)),
+                          lambda: list(queryset.annotate(legacy=LEGACY_QUANTITY).values_list("legacy", flat=True).iterator(chunk_size=5000)))
+            self._compare("Sum in Python", repeat, lambda: sum(ints), lambda: sum(decimals, Decimal(0)))
+
+            new_field = HundredthsField()
+            old_field = serializers.DecimalField(max_digits=5, decimal_places=2)
+            self._compare("Serialize values", repeat,
+                          lambda: [new_field.to_representation(value) for value in ints],
+                          lambda: [old_field.to_representation(value) for value in decimals])
+
+            same = [new_field.to_representation(value) for value in ints] == [old_field.to_representation(value) for value in decimals]
+            self.stdout.write(f"\nIdentical API output: {same}")
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        rng = random.Random(0)
+        user = User.objects.create_user(username="bench_aggregates", email="bench_aggregates@example.com")
+        source = AnimalProteinSource.objects.create(source_name="bench_aggregates", protein_per_100g="25.00", category="bench")
+        ProteinIntake.objects.bulk_create(
+            (
+                ProteinIntake(
+                    user=user,
+                    protein_source=source,
+                    protein_quantity_cg=rng.randint(1, 99999),
+                    intake_date=date(2026, 1, 1) + timedelta(days=i % 365),
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+        return ProteinIntake.objects.filter(user=user)
+
+    def _compare(self, label, repeat, integer, legacy):
+        int_time, _ = _best_of(repeat, integer)
+        dec_time, _ = _best_of(repeat, legacy)
+        self.stdout.write(f"\n{label}")
+        self.stdout.write(f"  integer centigrams {int_time * 1000:9.2f} ms")
+        self.stdout.write(f"  Decimal            {dec_time * 1000:9.2f} ms  ({dec_time / int_time:.1f}x slower)")
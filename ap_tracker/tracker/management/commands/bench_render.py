@@ -0,0 +1,71 @@
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.middleware.gzip import GZipMiddleware
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from tracker.middleware import brotli
+from tracker.models import ProteinIntake
+from tracker.renderers import FastJSONRenderer, orjson
+from tracker.serializers import ProteinIntakeSerializer
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON encoding and compression of a large /api/intakes/-style list (no database needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Rows in the list (default 10000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is reported (default 5).")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        created = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+        intakes = [
+            ProteinIntake(
+                id=i + 1,
+                user_id=1 + i % 50,
+                protein_source_id=1 + i % 12,
+                protein_quantity_cg=(10 + i % 90) * 100 + i % 100,
+                intake_date=date(2026, 1, 1) + timedelta(days=i % 365),
+                created_at=created + timedelta(seconds=i),
+            )
+            for i in range(rows)
+        ]
+        data = ProteinIntakeSerializer(intakes, many=True).data
+
+        self.stdout.write(f"{rows} rows, best of {repeat}")
+        self.stdout.write(f"orjson: {'available' if orjson else 'not installed (fast renderer falls back to stdlib)'}")
+
+        stock_time, stock_body = _best_of(repeat, lambda: JSONRenderer().render(data))
+        fast_time, fast_body = _best_of(repeat, lambda: FastJSONRenderer().render(data))
+        self.stdout.write("\nEncoding")
+        self.stdout.write(f"  JSONRenderer      {stock_time * 1000:8.2f} ms  {len(stock_body):>10,} bytes")
+        self.stdout.write(f"  FastJSONRenderer  {fast_time * 1000:8.2f} ms  {len(fast_body):>10,} bytes"
+                          f"  ({stock_time / fast_time:.1f}x, identical bytes on this data: {fast_body == stock_body})")
+
+        self.stdout.write("\nCompression of the encoded body")
+        gzip_time, gzipped = _best_of(
+            repeat, lambda: compress_string(fast_body, max_random_bytes=GZipMiddleware.max_random_bytes)
+        )
+        self.stdout.write(f"  gzip              {gzip_time * 1000:8.2f} ms  {len(gzipped):>10,} bytes"
+                          f"  ({len(gzipped) / len(fast_body):.1%} of original)")
+        if brotli is not None:
+            quality = settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
+            br_time, brotlied = _best_of(repeat, lambda: brotli.compress(fast_body, quality=quality))
+            self.stdout.write(f"  {f'brotli (q={quality})':<18}{br_time * 1000:8.2f} ms  {len(brotlied):>10,} bytes"
+                              f"  ({len(brotlied) / len(fast_body):.1%} of original)")
+        else:
+            self.stdout.write("  brotli            not installed")
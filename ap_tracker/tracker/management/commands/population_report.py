@@ -0,0 +1,34 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from tracker.analytics import DEFAULT_CHUNK_SIZE, population_report
+
+
+class Command(BaseCommand):
+    help = "Print the population analytics report (JSON) for a date window. Defaults to the last 30 days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First day of the window (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last day of the window (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Rows streamed from the database per chunk (default {DEFAULT_CHUNK_SIZE}).")
+        parser.add_argument("--no-cache", action="store_true", help="Recompute even if a cached report exists.")
+
+    def handle(self, *args, **options):
+        end = parse_date(options["end"]) if options["end"] else timezone.localdate()
+        if not end:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+        start = parse_date(options["start"]) if options["start"] else end - timedelta(days=29)
+        if not start:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+        if start > end:
+            raise CommandError("start must be <= end.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        report = population_report(start, end, chunk_size=options["chunk_size"], use_cache=not options["no_cache"])
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.analytics import DEFAULT_CHUNK_SIZE, refresh_adherence_distribution
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-month adherence histograms used by /api/me/adherence-rank/. Run periodically (e.g. hourly cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", action="append", metavar="YYYY-MM",
+                            help="Month to refresh (repeatable). Defaults to the current and previous month.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Per-user rows streamed from the database per chunk (default {DEFAULT_CHUNK_SIZE}).")
+
+    def handle(self, *args, **options):
+        if options["month"]:
+            try:
+                periods = [datetime.strptime(raw, "%Y-%m").date() for raw in options["month"]]
+            except ValueError:
+                raise CommandError("Invalid month format. Use YYYY-MM.")
+        else:
+            this_month = timezone.localdate().replace(day=1)
+            periods = [(this_month - timedelta(days=1)).replace(day=1), this_month]
+
+        for period_start in periods:
+            distribution = refresh_adherence_distribution(period_start, chunk_size=options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{period_start:%Y-%m}: ranked {distribution.users} user(s)."
+            ))
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: load the WSGI app and the URLconf (views included),
+# i.e. everything a new worker does before it can serve its first request.
+READY_SNIPPET = """
+import time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(f"{time.perf_counter() - start:.6f}")
+"""
+
+
+class Command(BaseCommand):
+    help = "Profile worker startup: time from spawn to ready, and an import-time breakdown (python -X importtime)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Rows to show in each table (default 15).")
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average the ready time over (default 3).")
+
+    def _run(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", READY_SNIPPET],
+            capture_output=True, text=True, env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+    def handle(self, *args, **options):
+        runs = [self._run() for _ in range(max(options["runs"], 1))]
+        ready = sorted(seconds for seconds, _ in runs)
+        imports = runs[-1][1]
+
+        # "import time: self [us] | cumulative | imported package" (nesting shown by indentation)
+        self_by_package = defaultdict(int)
+        top_level = []
+        for line in imports.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            if not self_us.strip().isdigit():
+                continue  # header row
+            module = name.strip()
+            self_by_package[module.split(".")[0]] += int(self_us)
+            if name.startswith(" ") and not name.startswith("  "):
+                top_level.append((int(cumulative_us), module))
+
+        self.stdout.write(f"Ready in {ready[len(ready) // 2] * 1000:.1f} ms (median of {len(ready)} run(s))")
+        self.stdout.write("\nSlowest top-level imports (cumulative):")
+        for cumulative_us, module in sorted(top_level, reverse=True)[:options["top"]]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+        self.stdout.write("\nImport time by package (self):")
+        for package, self_us in sorted(self_by_package.items(), key=lambda item: item[1], reverse=True)[:options["top"]]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}")
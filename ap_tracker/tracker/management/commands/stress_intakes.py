@@ -0,0 +1,228 @@
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Sum
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from tracker.models import AnimalProteinSource, ProteinIntake, IntakeSummary
+from tracker.services import generate_targets_for_range
+from tracker.units import format_hundredths
+
+User = get_user_model()
+
+USERNAME_PREFIX = "stress_"
+OPERATIONS = ("create", "update", "delete")
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent intake create/update/delete requests at the app from a thread pool, "
+        "then check every IntakeSummary against the true sum of its intakes. "
+        "Runs against the configured database (SQLite or PostgreSQL via DATABASE_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Worker threads (default 8).")
+        parser.add_argument("--ops", type=int, default=400, help="Total requests to send (default 400).")
+        parser.add_argument("--users", type=int, default=2,
+                            help="Stress users to spread requests over; 1 puts every request on the same user (default 2).")
+        parser.add_argument("--days", type=int, default=2,
+                            help="Distinct intake dates to use; fewer days means more contention per summary (default 2).")
+        parser.add_argument("--mix", default="60,25,15",
+                            help="Percent of create,update,delete requests (default 60,25,15).")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for a repeatable run.")
+        parser.add_argument("--with-limits", action="store_true",
+                            help="Keep throttling and admission control on (off by default so they don't mask write errors).")
+        parser.add_argument("--keep", action="store_true", help="Keep the stress users and their data afterwards.")
+        parser.add_argument("--force", action="store_true", help="Allow running when DEBUG is off.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("This writes to the configured database. Set DEBUG=True or pass --force.")
+        try:
+            weights = [int(part) for part in options["mix"].split(",")]
+        except ValueError:
+            weights = []
+        if len(weights) != 3 or sum(weights) <= 0 or min(weights) < 0:
+            raise CommandError("--mix must be three non-negative integers, e.g. 60,25,15.")
+        for name in ("threads", "ops", "users", "days"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be at least 1.")
+
+        overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+        if not options["with_limits"]:
+            overrides.update(
+                THROTTLE_BUCKETS={scope: (10 ** 9, 10 ** 9) for scope in settings.THROTTLE_BUCKETS},
+                ADMISSION_MAX_IN_FLIGHT=0,
+                ADMISSION_DB_LATENCY_MS=0,
+            )
+
+        # Only rows this run creates are ever deleted, so it must not pick up existing ones
+        taken = list(User.objects.filter(username__startswith=USERNAME_PREFIX).values_list("username", flat=True)[:5])
+        if AnimalProteinSource.objects.filter(source_name=f"{USERNAME_PREFIX}source").exists():
+            taken.append(f"source {USERNAME_PREFIX}source")
+        if taken:
+            raise CommandError(
+                f"Refusing to run: {', '.join(taken)} already exist. Remove leftovers from an earlier --keep run first."
+            )
+
+        self.created_user_ids = []
+        self.source_id = None
+        try:
+            users, days = self._setup(options["users"], options["days"])
+            with override_settings(**overrides):
+                results, elapsed = self._run(users, days, weights, options)
+            self._report(results, elapsed, options)
+            mismatches = self._verify(users, days)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(pk__in=self.created_user_ids).delete()
+                AnimalProteinSource.objects.filter(pk=self.source_id).delete()
+
+        if mismatches:
+            for user, day, summary, actual in mismatches[:10]:
+                shown = format_hundredths(summary) if summary is not None else None
+                self.stdout.write(f"  {user.username} {day}: summary {shown} g, actual {format_hundredths(actual)} g")
+            raise CommandError(f"{len(mismatches)} IntakeSummary row(s) do not match the sum of their intakes.")
+        self.stdout.write(self.style.SUCCESS("All summaries match the sum of their intakes."))
+
+    def _setup(self, n_users, n_days):
+        today = timezone.localdate()
+        days = [today - timedelta(days=offset) for offset in range(n_days)]
+        source = AnimalProteinSource.objects.create(
+            source_name=f"{USERNAME_PREFIX}source", protein_per_100g="25.00", category="stress"
+        )
+        self.source_id = source.id
+
+        users = []
+        for i in range(n_users):
+            user = User.objects.create(
+                username=f"{USERNAME_PREFIX}{i}", email=f"{USERNAME_PREFIX}{i}@example.com", weight_dag=7000
+            )
+            self.created_user_ids.append(user.id)
+            generate_targets_for_range(user=user, start=min(days), end=max(days))
+            users.append(user)
+        return users, days
+
+    def _run(self, users, days, weights, options):
+        rng = random.Random(options["seed"])
+        # Pre-draw the plan so a seed gives the same sequence of (user, operation, day, centigrams)
+        plan = [
+            (rng.randrange(len(users)), rng.choices(OPERATIONS, weights)[0], rng.choice(days), rng.randint(1, 99999))
+            for _ in range(options["ops"])
+        ]
+        chunks = [plan[i::options["threads"]] for i in range(options["threads"])]
+
+        # Failed requests are counted in the report; don't also log a traceback for each one
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+                results = list(pool.map(lambda chunk: self._worker(users, chunk, options["seed"]), chunks))
+        finally:
+            request_logger.setLevel(previous_level)
+        return results, time.perf_counter() - start
+
+    def _worker(self, users, plan, seed):
+        rng = random.Random(seed)
+        clients = {}
+        owned = defaultdict(list)  # user index -> intake ids created by this thread
+        outcomes = Counter()
+        latencies = defaultdict(list)
+        try:
+            for user_index, operation, day, centigrams in plan:
+                client = clients.get(user_index)
+                if client is None:
+                    client = clients[user_index] = Client()
+                    client.force_login(users[user_index])
+                if operation != "create" and not owned[user_index]:
+                    operation = "create"
+
+                grams = format_hundredths(centigrams)
+                started = time.perf_counter()
+                try:
+                    if operation == "create":
+                        resp = client.post(
+                            "/api/intakes/",
+                            {"protein_source": self.source_id, "protein_quantity_g": grams, "intake_date": str(day)},
+                            content_type="application/json",
+                        )
+                        if resp.status_code == 201:
+                            owned[user_index].append(resp.json()["id"])
+                    elif operation == "update":
+                        intake_id = rng.choice(owned[user_index])
+                        resp = client.patch(
+                            f"/api/intakes/{intake_id}/",
+                            {"protein_quantity_g": grams, "intake_date": str(day)},
+                            content_type="application/json",
+                        )
+                    else:
+                        intake_id = owned[user_index].pop(rng.randrange(len(owned[user_index])))
+                        resp = client.delete(f"/api/intakes/{intake_id}/")
+                    outcome = "ok" if resp.status_code < 400 else f"HTTP {resp.status_code}"
+                except Exception as exc:  # e.g. "database is locked", lock timeouts, deadlocks
+                    outcome = type(exc).__name__
+                latencies[operation].append(time.perf_counter() - started)
+                outcomes[(operation, outcome)] += 1
+        finally:
+            connections.close_all()
+        return outcomes, latencies
+
+    def _report(self, results, elapsed, options):
+        outcomes = Counter()
+        latencies = defaultdict(list)
+        for worker_outcomes, worker_latencies in results:
+            outcomes.update(worker_outcomes)
+            for operation, values in worker_latencies.items():
+                latencies[operation].extend(values)
+
+        total = sum(outcomes.values())
+        errors = sum(count for (_, outcome), count in outcomes.items() if outcome != "ok")
+        self.stdout.write(
+            f"{total} requests from {options['threads']} thread(s) over {options['users']} user(s) "
+            f"and {options['days']} day(s) on {connections['default'].vendor}"
+        )
+        self.stdout.write(f"Elapsed {elapsed:.2f} s, throughput {total / elapsed:.1f} req/s, "
+                          f"error rate {errors / total:.1%}")
+        for operation in OPERATIONS:
+            values = sorted(latencies.get(operation, []))
+            if not values:
+                continue
+            failed = {outcome: count for (op, outcome), count in outcomes.items() if op == operation and outcome != "ok"}
+            line = (
+                f"  {operation:<7} {len(values):>6}  p50 {values[len(values) // 2] * 1000:7.1f} ms"
+                f"  p95 {values[int(len(values) * 0.95)] * 1000:7.1f} ms  errors {sum(failed.values())}"
+            )
+            self.stdout.write(f"{line} {failed}" if failed else line)
+
+    def _verify(self, users, days):
+        mismatches = []
+        for user in users:
+            actual = dict(
+                ProteinIntake.objects.filter(user=user, intake_date__in=days)
+                .values_list("intake_date")
+                .annotate(total=Sum("protein_quantity_cg"))
+            )
+            summaries = dict(
+                IntakeSummary.objects.filter(user=user, summary_date__in=days)
+                .values_list("summary_date", "total_protein_cg")
+            )
+            for day in days:
+                expected = actual.get(day) or 0
+                summary = summaries.get(day)
+                if summary is None and not expected:
+                    continue
+                if summary != expected:
+                    mismatches.append((user, day, summary, expected))
+        return mismatches
@@ -0,0 +1,152 @@
+"""
+Project middleware.
+
+CompressionMiddleware: like django.middleware.gzip.GZipMiddleware, but with a
+configurable size threshold and Brotli negotiation for JSON responses when
+the optional `brotli` package is installed. Falls back to gzip otherwise.
+
+AdmissionControlMiddleware: sheds API load with 503 + Retry-After when the
+process is saturated or the database has become slow.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepted_encodings(header):
+    # "gzip, br;q=0.8, identity;q=0" -> {"gzip", "br"}
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses of at least RESPONSE_COMPRESSION_MIN_BYTES with Brotli
+    or gzip, whichever the client accepts (Brotli preferred).
+
+    Brotli has no random padding, so it is only used for JSON API responses.
+    HTML (admin, browsable API) carries CSRF tokens, and stays on gzip with
+    GZipMiddleware's BREACH padding.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+        is_json = response.get("Content-Type", "").startswith("application/json")
+        if brotli is not None and is_json and "br" in accepted:
+            encoding = "br"
+            compressed = brotli.compress(response.content, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+        elif "gzip" in accepted:
+            encoding = "gzip"
+            # Random padding as in GZipMiddleware (BREACH mitigation)
+            compressed = compress_string(response.content, max_random_bytes=GZipMiddleware.max_random_bytes)
+        else:
+            return response
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = encoding
+        # The body changed, so a strong ETag no longer applies
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
+
+
+class AdmissionControlMiddleware:
+    """
+    Reject API requests with 503 + Retry-After while either:
+    - ADMISSION_MAX_IN_FLIGHT requests are already running in this process, or
+    - the moving average of recent query latency exceeds ADMISSION_DB_LATENCY_MS.
+
+    The latency average decays with ADMISSION_DB_LATENCY_HALF_LIFE while no
+    queries run, so shedding stops once the database has had time to recover.
+    A threshold of 0 disables that check.
+    """
+    # Weight of the newest query in the latency moving average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.db_latency_ms = 0.0
+        self.db_latency_updated = time.monotonic()
+
+    def _current_db_latency(self, now):
+        elapsed = now - self.db_latency_updated
+        return self.db_latency_ms * 0.5 ** (elapsed / settings.ADMISSION_DB_LATENCY_HALF_LIFE)
+
+    def _time_query(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            now = time.monotonic()
+            with self.lock:
+                latency = self._current_db_latency(now)
+                self.db_latency_ms = latency + self.LATENCY_SMOOTHING * ((now - start) * 1000 - latency)
+                self.db_latency_updated = now
+
+    def _overloaded(self):
+        max_in_flight = settings.ADMISSION_MAX_IN_FLIGHT
+        max_latency = settings.ADMISSION_DB_LATENCY_MS
+        if max_in_flight and self.in_flight >= max_in_flight:
+            return True
+        return bool(max_latency) and self._current_db_latency(time.monotonic()) > max_latency
+
+    def __call__(self, request):
+        if not request.path.startswith(settings.ADMISSION_CONTROL_PATH_PREFIX):
+            return self.get_response(request)
+
+        with self.lock:
+            overloaded = self._overloaded()
+            if not overloaded:
+                self.in_flight += 1
+
+        if overloaded:
+            response = JsonResponse(
+                {"detail": "Service is busy. Please retry shortly."},
+                status=503,
+            )
+            response["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+            return response
+
+        try:
+            with connection.execute_wrapper(self._time_query):
+                return self.get_response(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 15:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_alter_proteinintake_protein_source_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProteinIntake',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('protein_quantity_g', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('intake_date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('protein_source', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_intakes', to='tracker.animalproteinsource')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_intakes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'intake_date'], name='archived_intake_user_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_archivedproteinintake'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAdherenceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days_tracked', models.PositiveIntegerField(default=0)),
+                ('days_on_target', models.PositiveIntegerField(default=0)),
+                ('last_summary_date', models.DateField(blank=True, null=True)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('run_before_last', models.PositiveIntegerField(default=0)),
+                ('window_7_total_grams', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('window_7_days', models.PositiveSmallIntegerField(default=0)),
+                ('window_7_on_target', models.PositiveSmallIntegerField(default=0)),
+                ('window_30_total_grams', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('window_30_days', models.PositiveSmallIntegerField(default=0)),
+                ('window_30_on_target', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='adherence_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_useradherencestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdherenceDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(unique=True)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('cumulative_counts', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 16:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_adherencedistribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntakeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('days_tracked', models.PositiveSmallIntegerField(default=0)),
+                ('days_on_target', models.PositiveSmallIntegerField(default=0)),
+                ('total_protein_grams', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('total_target_grams', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intake_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'granularity', 'period_start'), name='unique_rollup_per_user_period')],
+            },
+        ),
+    ]
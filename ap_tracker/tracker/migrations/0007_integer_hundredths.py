@@ -0,0 +1,165 @@
+# Generated by Django 6.0 on 2026-10-19 16:40
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, IntegerField
+from django.db.models.functions import Cast, Round
+
+
+# (model, old decimal field, new integer field holding hundredths of the old unit)
+CONVERTED_FIELDS = [
+    ("user", "weight_kg", "weight_dag"),
+    ("proteinintake", "protein_quantity_g", "protein_quantity_cg"),
+    ("archivedproteinintake", "protein_quantity_g", "protein_quantity_cg"),
+    ("dailyproteintarget", "target_grams", "target_cg"),
+    ("intakesummary", "total_protein_grams", "total_protein_cg"),
+    ("intakesummary", "target_protein_grams", "target_protein_cg"),
+    ("useradherencestats", "window_7_total_grams", "window_7_total_cg"),
+    ("useradherencestats", "window_30_total_grams", "window_30_total_cg"),
+    ("intakerollup", "total_protein_grams", "total_protein_cg"),
+    ("intakerollup", "total_target_grams", "total_target_cg"),
+]
+
+
+def to_hundredths(apps, schema_editor):
+    # One UPDATE per column; ROUND absorbs binary noise from SQLite's REAL storage
+    for model_name, old, new in CONVERTED_FIELDS:
+        model = apps.get_model("tracker", model_name)
+        model.objects.update(**{new: Cast(Round(F(old) * 100), IntegerField())})
+
+
+def from_hundredths(apps, schema_editor):
+    for model_name, old, new in CONVERTED_FIELDS:
+        model = apps.get_model("tracker", model_name)
+        model.objects.update(**{old: Cast(F(new), FloatField()) / 100})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_intakerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='weight_dag',
+            field=models.PositiveIntegerField(blank=True, help_text='Hundredths of a kg (70.55 kg = 7055).', null=True),
+        ),
+        migrations.AddField(
+            model_name='proteinintake',
+            name='protein_quantity_cg',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedproteinintake',
+            name='protein_quantity_cg',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='dailyproteintarget',
+            name='target_cg',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='intakesummary',
+            name='total_protein_cg',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='intakesummary',
+            name='target_protein_cg',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='useradherencestats',
+            name='window_7_total_cg',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='useradherencestats',
+            name='window_30_total_cg',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='intakerollup',
+            name='total_protein_cg',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='intakerollup',
+            name='total_target_cg',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        # Nullable while both columns exist, so unapplying can re-add them before the data is copied back
+        migrations.AlterField(
+            model_name='proteinintake',
+            name='protein_quantity_g',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedproteinintake',
+            name='protein_quantity_g',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailyproteintarget',
+            name='target_grams',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='intakesummary',
+            name='total_protein_grams',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='intakesummary',
+            name='target_protein_grams',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.RunPython(to_hundredths, from_hundredths),
+        migrations.RemoveField(
+            model_name='user',
+            name='weight_kg',
+        ),
+        migrations.RemoveField(
+            model_name='proteinintake',
+            name='protein_quantity_g',
+        ),
+        migrations.RemoveField(
+            model_name='archivedproteinintake',
+            name='protein_quantity_g',
+        ),
+        migrations.RemoveField(
+            model_name='dailyproteintarget',
+            name='target_grams',
+        ),
+        migrations.RemoveField(
+            model_name='intakesummary',
+            name='total_protein_grams',
+        ),
+        migrations.RemoveField(
+            model_name='intakesummary',
+            name='target_protein_grams',
+        ),
+        migrations.RemoveField(
+            model_name='useradherencestats',
+            name='window_7_total_grams',
+        ),
+        migrations.RemoveField(
+            model_name='useradherencestats',
+            name='window_30_total_grams',
+        ),
+        migrations.RemoveField(
+            model_name='intakerollup',
+            name='total_protein_grams',
+        ),
+        migrations.RemoveField(
+            model_name='intakerollup',
+            name='total_target_grams',
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .units import div_round
+
 # Create custom user model
 class User(AbstractUser):
     email = models.EmailField(unique=True)
-    weight_kg = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    # Body weight in hundredths of a kg (70.55 kg -> 7055); the API exposes it as weight_kg
+    weight_dag = models.PositiveIntegerField(null=True, blank=True, help_text="Hundredths of a kg (70.55 kg = 7055).")
     created_at = models.DateTimeField(auto_now_add=True)
 
 
@@ -23,7 +26,8 @@ class ProteinIntake(models.Model):
     # Activity belongs to a user(one-to-many relationship)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="protein_intake")
     protein_source = models.ForeignKey(AnimalProteinSource, on_delete=models.CASCADE, related_name="protein_intake")
-    protein_quantity_g = models.DecimalField(max_digits=5, decimal_places=2)
+    # Gram amounts are stored as integer centigrams (12.34 g -> 1234), see tracker/units.py
+    protein_quantity_cg = models.PositiveIntegerField()
     intake_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -34,7 +38,7 @@ from django.conf import settings
 
 class DailyProteinTarget(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_targets")
-    target_grams = models.DecimalField(max_digits=5, decimal_places=2)
+    target_cg = models.PositiveIntegerField()
     target_date = models.DateField()
     calculation_method = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -49,11 +53,85 @@ class DailyProteinTarget(models.Model):
 class IntakeSummary(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="intake_summaries")
     summary_date = models.DateField()
-    total_protein_grams = models.DecimalField(max_digits=5, decimal_places=2)
-    target_protein_grams = models.DecimalField(max_digits=5, decimal_places=2)
+    total_protein_cg = models.PositiveIntegerField()
+    target_protein_cg = models.PositiveIntegerField()
 
     class Meta:
         # One summary per day per user
         constraints = [
             models.UniqueConstraint(fields=["user", "summary_date"], name="unique_summary_per_user_per_date")
-        ]
\ No newline at end of file
+        ]
+
+class ArchivedProteinIntake(models.Model):
+    # Cold copy of an old ProteinIntake row (moved by `manage.py archive_intakes`).
+    # Keeps the original id so ids stay unique across hot and archived rows,
+    # and only carries one composite index instead of the per-FK indexes.
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_intakes", db_index=False)
+    protein_source = models.ForeignKey(AnimalProteinSource, on_delete=models.CASCADE, related_name="archived_intakes", db_index=False)
+    protein_quantity_cg = models.PositiveIntegerField()
+    intake_date = models.DateField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "intake_date"], name="archived_intake_user_date"),
+        ]
+
+
+class UserAdherenceStats(models.Model):
+    # Materialized adherence stats, folded in incrementally whenever an IntakeSummary changes.
+    # Rolling windows and the current streak are anchored on last_summary_date, the latest summary
+    # up to the day of the last write; services.current_adherence_stats brings them up to today.
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="adherence_stats")
+    days_tracked = models.PositiveIntegerField(default=0)
+    days_on_target = models.PositiveIntegerField(default=0)
+    last_summary_date = models.DateField(null=True, blank=True)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    # Length of the on-target run ending the day before last_summary_date
+    run_before_last = models.PositiveIntegerField(default=0)
+    # Sums of up to 30 daily totals can pass the 32-bit limit, so the aggregates are 64-bit
+    window_7_total_cg = models.PositiveBigIntegerField(default=0)
+    window_7_days = models.PositiveSmallIntegerField(default=0)
+    window_7_on_target = models.PositiveSmallIntegerField(default=0)
+    window_30_total_cg = models.PositiveBigIntegerField(default=0)
+    window_30_days = models.PositiveSmallIntegerField(default=0)
+    window_30_on_target = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class AdherenceDistribution(models.Model):
+    # Histogram of per-user adherence (% of tracked days on target) for one calendar month.
+    # cumulative_counts[i] = users whose adherence is below ADHERENCE_BUCKET_EDGES[i + 1].
+    period_start = models.DateField(unique=True)
+    users = models.PositiveIntegerField(default=0)
+    cumulative_counts = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+
+class IntakeRollup(models.Model):
+    # Weekly / monthly totals of a user's IntakeSummary rows. Kept in step by
+    # services.apply_summary_change; rebuilt set-wise by `manage.py backfill_rollups`.
+    WEEK = "week"
+    MONTH = "month"
+    GRANULARITY_CHOICES = [(WEEK, "Week"), (MONTH, "Month")]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="intake_rollups")
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    # Monday for weeks, the 1st for months
+    period_start = models.DateField()
+    days_tracked = models.PositiveSmallIntegerField(default=0)
+    days_on_target = models.PositiveSmallIntegerField(default=0)
+    total_protein_cg = models.PositiveBigIntegerField(default=0)
+    total_target_cg = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "granularity", "period_start"], name="unique_rollup_per_user_period")
+        ]
+
+    @property
+    def average_protein_cg(self):
+        return div_round(self.total_protein_cg, self.days_tracked) if self.days_tracked else 0
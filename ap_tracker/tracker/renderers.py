@@ -0,0 +1,46 @@
+"""
+Fast JSON rendering for API responses.
+
+FastJSONRenderer is a drop-in for DRF's JSONRenderer that encodes with
+orjson when it is installed. Anything orjson does not handle natively
+(Decimal, lazy strings, datetimes, ...) goes through DRF's own encoder, so
+those values render exactly as before. Floats are the exception, since
+orjson writes them itself:
+- exponents have no "+" (1e16 rather than 1e+16); both parse to the same value
+- NaN and Infinity render as null, where the stock renderer raises ValueError
+Checking payloads for floats first would cost more than the stock encoder,
+so callers that can produce non-finite floats must handle them. Pretty-printed
+output (indent=N, the browsable API) and non-default JSON settings use the
+stock renderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    if orjson is not None:
+        # Datetimes go through DRF's encoder too, so e.g. "+00:00" still becomes "Z"
+        orjson_options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.orjson_options)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits: let the stdlib encoder decide
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer: escape U+2028/U+2029 so the output is a strict JavaScript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,99 @@
+"""
+OpenAPI schema served as a static artifact.
+
+build.sh writes the schema once per format with `manage.py spectacular`; if a
+file is missing, that rendering is generated on the first request and kept for
+the life of the process. Either way it is served from memory with an ETag, and
+the drf_spectacular generator is only imported when it is actually needed.
+
+Like drf_spectacular's SpectacularAPIView, the response is YAML unless the
+client asks for JSON with ?format=json or its Accept header.
+"""
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+# Media type -> format, in order of preference when the client accepts several (YAML first)
+SCHEMA_MEDIA_TYPES = {
+    "application/vnd.oai.openapi": "yaml",
+    "application/yaml": "yaml",
+    "application/vnd.oai.openapi+json": "json",
+    "application/json": "json",
+}
+# drf_spectacular's renderer for each format
+SCHEMA_RENDERERS = {
+    "yaml": "OpenApiYamlRenderer",
+    "json": "OpenApiJsonRenderer",
+}
+
+
+@cache
+def _generated_schema():
+    # Deferred: generating the schema introspects every view and serializer
+    from drf_spectacular.generators import SchemaGenerator
+
+    return SchemaGenerator().get_schema(request=None, public=True)
+
+
+@cache
+def _schema(fmt):
+    path = Path(settings.OPENAPI_SCHEMA_FILES[fmt])
+    if path.exists():
+        body = path.read_bytes()
+    else:
+        from drf_spectacular import renderers
+
+        renderer = getattr(renderers, SCHEMA_RENDERERS[fmt])()
+        body = renderer.render(_generated_schema(), renderer_context={})
+    return body, hashlib.sha256(body).hexdigest()
+
+
+def _media_type(request):
+    """
+    Media type to respond with: ?format= first, then the Accept header.
+    None when neither names a format we serve.
+    """
+    fmt = request.GET.get("format")
+    if fmt is not None:
+        return next((media_type for media_type, f in SCHEMA_MEDIA_TYPES.items() if f == fmt), None)
+    return request.get_preferred_type(list(SCHEMA_MEDIA_TYPES))
+
+
+def _etag(request):
+    media_type = _media_type(request)
+    return _schema(SCHEMA_MEDIA_TYPES[media_type])[1] if media_type else None
+
+
+@require_safe
+@condition(etag_func=_etag)
+def schema_view(request):
+    media_type = _media_type(request)
+    if media_type is None:
+        if "format" in request.GET:
+            raise Http404("Unknown schema format; use ?format=yaml or ?format=json.")
+        return HttpResponse(status=406)
+
+    fmt = SCHEMA_MEDIA_TYPES[media_type]
+    # YAML is text, so it carries a charset; JSON is always UTF-8
+    content_type = f"{media_type}; charset=utf-8" if fmt == "yaml" else media_type
+    response = HttpResponse(_schema(fmt)[0], content_type=content_type)
+    # Clients may keep it, but must revalidate (cheap 304) so a new deploy is picked up
+    response["Cache-Control"] = "no-cache"
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+@cache
+def _swagger_view():
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    return SpectacularSwaggerView.as_view(url_name="schema")
+
+
+def swagger_view(request, *args, **kwargs):
+    return _swagger_view()(request, *args, **kwargs)
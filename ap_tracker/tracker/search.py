@@ -0,0 +1,247 @@
+"""
+Process-local search index over the protein source catalog.
+
+Every word of `source_name` and `category` goes into a sorted token list with
+the alphabetical ranks of the names it occurs in, so a prefix lookup is two
+bisects and matches come out already in order. Name trigrams back a fuzzy
+fallback for typos and mid-word fragments. The index is built on first use
+and rebuilt when:
+- a source is saved or deleted (post_save/post_delete, registered in TrackerConfig.ready)
+- another process changed the version key in the cache (settings.CACHES), checked at most
+  every SOURCE_SEARCH_VERSION_CHECK_SECONDS; only a shared cache (Redis, Memcached) carries
+  it between processes, with the default LocMemCache the TTL below is the only cross-process signal
+- it is older than SOURCE_SEARCH_INDEX_TTL (covers bulk writes that skip signals)
+"""
+import heapq
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AnimalProteinSource
+from .serializers import AnimalProteinSourceSerializer
+
+VERSION_KEY = "tracker:source-search-version"
+
+# Share of the query's trigrams a name must contain to count as a fuzzy match
+MIN_SIMILARITY = 0.5
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(text):
+    grams = set()
+    for word in _words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SourceSearchIndex:
+    def __init__(self, rows):
+        self.rows = {}
+        self._names = {}
+        self._categories = {}
+        self._name_words = {}
+        self._category_words = {}
+        self._trigram_ids = {}
+
+        for row in rows:
+            pk = row["id"]
+            self.rows[pk] = row
+            self._name_words[pk] = _words(row["source_name"])
+            self._names[pk] = " ".join(self._name_words[pk])
+            self._categories[pk] = row["category"].lower()
+            self._category_words[pk] = _words(row["category"])
+            for gram in _trigrams(row["source_name"]):
+                self._trigram_ids.setdefault(gram, []).append(pk)
+
+        by_name = sorted((name, pk) for pk, name in self._names.items())
+        self._sorted_names = [name for name, _ in by_name]
+        self._sorted_name_ids = [pk for _, pk in by_name]
+
+        # " word word ...", so "does a word start with term" is one substring test for " " + term
+        self._name_text = {pk: f" {name}" for pk, name in self._names.items()}
+        self._word_text = {pk: f" {name} {' '.join(self._category_words[pk])}" for pk, name in self._names.items()}
+
+        # Per word, the alphabetical ranks of the names it occurs in: as a name word,
+        # and as a name or category word. Walking these in rank order yields matches
+        # already sorted, so a search can stop as soon as it has `limit` of them.
+        name_postings = {}
+        all_postings = {}
+        self._category_ranks = {}
+        for rank, pk in enumerate(self._sorted_name_ids):
+            self._category_ranks.setdefault(self._categories[pk], []).append(rank)
+            name_words = set(self._name_words[pk])
+            for word in name_words:
+                name_postings.setdefault(word, []).append(rank)
+            for word in name_words | set(self._category_words[pk]):
+                all_postings.setdefault(word, []).append(rank)
+        self._tokens = sorted(all_postings)
+        self._name_postings = [name_postings.get(token, []) for token in self._tokens]
+        self._all_postings = [all_postings[token] for token in self._tokens]
+        # _posting_counts[i] = postings of the first i tokens, to size a prefix range in O(1)
+        self._posting_counts = [0]
+        for postings in self._all_postings:
+            self._posting_counts.append(self._posting_counts[-1] + len(postings))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _prefix_range(self, keys, prefix):
+        lo = bisect_left(keys, prefix)
+        return lo, bisect_left(keys, prefix + "\uffff", lo)
+
+    def _ranked_ids(self, postings, term):
+        # Ids of names with a word starting with `term`, alphabetically, without duplicates
+        lo, hi = self._prefix_range(self._tokens, term)
+        previous = None
+        for rank in heapq.merge(*postings[lo:hi]):
+            if rank != previous:
+                previous = rank
+                yield self._sorted_name_ids[rank]
+
+    def search(self, query, *, category=None, limit=10):
+        """
+        Best `limit` rows for `query`, best first.
+
+        Tiers: names starting with the query, names where every term prefixes
+        a word, then matches where some term only hit the category.
+        Alphabetical within a tier, so an exact name comes before its longer
+        variants. With no such match, falls back to trigram-similar names
+        (typos, mid-word fragments), most similar first.
+        """
+        terms = _words(query)
+        if not terms:
+            return []
+        query = " ".join(terms)
+        category = category.lower() if category else None
+
+        def allowed(pk):
+            return category is None or self._categories[pk] == category
+
+        # Whole-name prefixes come off the sorted name list already in order
+        found = []
+        lo, hi = self._prefix_range(self._sorted_names, query)
+        for pk in self._sorted_name_ids[lo:hi]:
+            if allowed(pk):
+                found.append(pk)
+                if len(found) == limit:
+                    return [self.rows[pk] for pk in found]
+
+        # Walk whichever is shorter, the postings of the rarest term or the category's names,
+        # and check the rest per name
+        def size(term):
+            lo, hi = self._prefix_range(self._tokens, term)
+            return self._posting_counts[hi] - self._posting_counts[lo]
+
+        driver = min(terms, key=size)
+        in_category = self._category_ranks.get(category, []) if category else None
+
+        def candidates(postings):
+            if in_category is not None and len(in_category) < size(driver):
+                return (self._sorted_name_ids[rank] for rank in in_category)
+            return self._ranked_ids(postings, driver)
+
+        seen = set(found)
+        starts = [f" {term}" for term in terms]
+        for texts, postings in ((self._name_text, self._name_postings), (self._word_text, self._all_postings)):
+            # Every name-only match is in `found` after the first pass; the second adds those
+            # where some term only hit the category
+            for pk in candidates(postings):
+                if pk not in seen and allowed(pk) and all(start in texts[pk] for start in starts):
+                    seen.add(pk)
+                    found.append(pk)
+                    if len(found) == limit:
+                        return [self.rows[pk] for pk in found]
+
+        # Fuzzy matches only when nothing matched directly, so near-misses don't crowd out real hits
+        if not found and len(query) >= 3:
+            grams = _trigrams(query)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._trigram_ids.get(gram, ()))
+            similar = []
+            for pk, count in shared.items():
+                if allowed(pk):
+                    # Scored against the query only, so long multi-word names are not penalised
+                    similarity = count / len(grams)
+                    if similarity >= MIN_SIMILARITY:
+                        similar.append((-similarity, self._names[pk], pk))
+            found += [pk for _, _, pk in heapq.nsmallest(limit - len(found), similar)]
+
+        return [self.rows[pk] for pk in found]
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+_index_built_at = 0.0
+_version = 0
+_version_checked_at = None
+
+
+def build_index():
+    # Format decimals once here, exactly as AnimalProteinSourceSerializer would
+    protein = AnimalProteinSourceSerializer().fields["protein_per_100g"]
+    rows = AnimalProteinSource.objects.values("id", "source_name", "category", "protein_per_100g")
+    return SourceSearchIndex(
+        {**row, "protein_per_100g": protein.to_representation(row["protein_per_100g"])}
+        for row in rows.iterator()
+    )
+
+
+def get_index():
+    global _index, _index_version, _index_built_at, _version, _version_checked_at
+
+    def fresh(index):
+        return index is not None and _index_version == version and time.monotonic() - _index_built_at < settings.SOURCE_SEARCH_INDEX_TTL
+
+    # A cache round trip costs more than the search itself, so the shared version is only polled now and then
+    now = time.monotonic()
+    if _version_checked_at is None or now - _version_checked_at >= settings.SOURCE_SEARCH_VERSION_CHECK_SECONDS:
+        _version, _version_checked_at = cache.get(VERSION_KEY, 0), now
+    version = _version
+    # Read once: invalidate_index() may reset the global from another thread at any time
+    index = _index
+    if fresh(index):
+        return index
+
+    with _lock:
+        # Another thread may have rebuilt it while we waited
+        index = _index
+        if not fresh(index):
+            # The version is read before the rows, so a write that lands mid-build still triggers a rebuild
+            index = build_index()
+            _index, _index_version, _index_built_at = index, version, time.monotonic()
+        return index
+
+
+def _bump_version():
+    # A fresh random value rather than incr: the database cache's incr is a read and a write,
+    # so two concurrent bumps could both store the same number and one change would go unnoticed
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_index():
+    global _index
+    # Drop this process's copy now; tell other processes once the write is committed
+    _index = None
+    transaction.on_commit(_bump_version)
+
+
+@receiver([post_save, post_delete], sender=AnimalProteinSource, dispatch_uid="tracker.search.invalidate")
+def _catalog_changed(sender, **kwargs):
+    invalidate_index()
@@ -1,12 +1,40 @@
 # Validate input and block malicious data
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import AnimalProteinSource, ProteinIntake
+from rest_framework.settings import api_settings
+from .models import AnimalProteinSource, ProteinIntake, ArchivedProteinIntake
 from django.contrib.auth import get_user_model
-from .models import DailyProteinTarget, IntakeSummary
+from .models import DailyProteinTarget, IntakeSummary, IntakeRollup
+from .units import format_hundredths, to_hundredths
 
 User = get_user_model()
 
+
+class HundredthsField(serializers.DecimalField):
+    """
+    A 2-decimal-place API value ("12.34") backed by an integer model field
+    holding hundredths (1234). Input is validated like a DecimalField and
+    converted exactly; output is formatted straight from the integer.
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", 5)
+        kwargs.setdefault("min_value", 0)
+        super().__init__(decimal_places=2, **kwargs)
+
+    def to_internal_value(self, data):
+        # DecimalField has already rejected anything finer than 2 decimal places
+        return to_hundredths(super().to_internal_value(data))
+
+    def to_representation(self, value):
+        if not getattr(self, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING):
+            return super().to_representation(Decimal(value).scaleb(-2))
+        return format_hundredths(value)
+
+
 class UserSerializer(serializers.ModelSerializer):
+    weight_kg = HundredthsField(source="weight_dag", required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = ["id", "username", "email", "weight_kg", "created_at"]
@@ -18,9 +46,11 @@ class AnimalProteinSourceSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 class ProteinIntakeSerializer(serializers.ModelSerializer):
+    protein_quantity_g = HundredthsField(source="protein_quantity_cg")
+
     class Meta:
         model = ProteinIntake
-        fields = "__all__"
+        fields = ["id", "protein_quantity_g", "intake_date", "created_at", "user", "protein_source"]
         read_only_fields = ["user", "created_at"]
 
         def validate_protein_quantity_grams(self, value):
@@ -28,20 +58,37 @@ class ProteinIntakeSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("protein_quantity_grams must be greater than 0.")
             return value
 
+class ArchivedProteinIntakeSerializer(serializers.ModelSerializer):
+    # Same shape as ProteinIntakeSerializer so archived rows can be listed alongside hot ones
+    protein_quantity_g = HundredthsField(source="protein_quantity_cg", read_only=True)
+
+    class Meta:
+        model = ArchivedProteinIntake
+        fields = ["id", "protein_quantity_g", "intake_date", "created_at", "user", "protein_source"]
+        read_only_fields = fields
+
 class DailyProteinTargetSerializer(serializers.ModelSerializer):
+    target_grams = HundredthsField(source="target_cg", read_only=True)
+
     class Meta:
         model = DailyProteinTarget
-        fields = "__all__"
-        read_only_fields = ["user", "target_grams", "created_at", "calculation_method"]
+        fields = ["id", "target_grams", "target_date", "calculation_method", "created_at", "user"]
+        read_only_fields = ["user", "created_at", "calculation_method"]
 
 class IntakeSummarySerializer(serializers.ModelSerializer):
+    # Daily totals are not capped at 999.99 g like single intakes
+    total_protein_grams = HundredthsField(source="total_protein_cg", max_digits=9)
+    target_protein_grams = HundredthsField(source="target_protein_cg", max_digits=9)
+
     class Meta:
         model = IntakeSummary
-        fields = "__all__"
+        fields = ["id", "summary_date", "total_protein_grams", "target_protein_grams", "user"]
         read_only_fields = ["user"]
 
 
 class MeSerializer(serializers.ModelSerializer):
+    weight_kg = HundredthsField(source="weight_dag", required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = ["id", "username", "email", "weight_kg", "created_at"]
@@ -55,6 +102,7 @@ class MeSerializer(serializers.ModelSerializer):
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
+    weight_kg = HundredthsField(source="weight_dag", required=False, allow_null=True)
 
     class Meta:
         model = User
@@ -62,4 +110,17 @@ class RegisterSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
     def create(self, validated_data):
-        return User.objects.create_user(**validated_data)
\ No newline at end of file
+        return User.objects.create_user(**validated_data)
+
+
+class IntakeRollupSerializer(serializers.ModelSerializer):
+    total_protein_grams = HundredthsField(source="total_protein_cg", read_only=True)
+    average_protein_grams = HundredthsField(source="average_protein_cg", read_only=True)
+    total_target_grams = HundredthsField(source="total_target_cg", read_only=True)
+
+    class Meta:
+        model = IntakeRollup
+        fields = [
+            "period_start", "days_tracked", "days_on_target",
+            "total_protein_grams", "average_protein_grams", "total_target_grams",
+        ]
@@ -1,5 +1,70 @@
-from django.db.models import Sum
-from .models import ProteinIntake, DailyProteinTarget, IntakeSummary
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Count, F, Q, Min, Max
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from .models import ProteinIntake, DailyProteinTarget, IntakeSummary, ArchivedProteinIntake, UserAdherenceStats
+from .models import IntakeRollup
+
+TARGET_CALCULATION_METHOD = "weight * 0.8"
+
+ARCHIVE_HORIZON_KEY = "tracker:archive-horizon"
+
+
+def calculate_target_cg(weight_dag):
+    # Formula: weight * 0.8, i.e. centigrams = (hundredths of a kg) * 4 / 5, rounded to the nearest
+    # centigram. A fifth never lands on a half, so this matches the decimal rounding exactly.
+    return (weight_dag * 4 + 2) // 5
+
+
+def archive_horizon():
+    """
+    Latest intake_date in the archive table, or None while it is empty. Kept in the
+    cache, so reads for days after it can skip the archive table entirely.
+
+    Only archive_intakes_before moves it, and only forward. With a per-process
+    cache (LocMemCache) web workers never see it move: restart them after
+    archiving, or use a shared backend (see settings.CACHES).
+    """
+    missing = object()
+    horizon = cache.get(ARCHIVE_HORIZON_KEY, missing)
+    if horizon is missing:
+        horizon = ArchivedProteinIntake.objects.aggregate(latest=Max("intake_date"))["latest"]
+        # add, not set: an archive run may have raised the horizon since the aggregate was read
+        if not cache.add(ARCHIVE_HORIZON_KEY, horizon, None):
+            horizon = cache.get(ARCHIVE_HORIZON_KEY, horizon)
+    return horizon
+
+
+def _raise_archive_horizon(day):
+    horizon = archive_horizon()
+    if horizon is None or day > horizon:
+        cache.set(ARCHIVE_HORIZON_KEY, day, None)
+
+
+def is_archived_range(start):
+    # True when rows dated on or after `start` (None: unbounded) may be in the archive table
+    horizon = archive_horizon()
+    return horizon is not None and (start is None or start <= horizon)
+
+
+def total_protein_for_user_date(*, user, day):
+    """
+    Sum the protein (centigrams) logged by user on day, across hot and archived intake rows.
+    """
+    tables = (ProteinIntake, ArchivedProteinIntake) if is_archived_range(day) else (ProteinIntake,)
+    total = 0
+    for model in tables:
+        total += (
+            model.objects
+            .filter(user=user, intake_date=day)
+            .aggregate(total=Sum("protein_quantity_cg"))
+            .get("total")
+        ) or 0
+    return total
+
 
 def upsert_intake_summary_for_user_date(*, user, day):
     """
@@ -8,24 +73,540 @@ def upsert_intake_summary_for_user_date(*, user, day):
 
     If no DailyProteinTarget exists for that day, returns (None, None).
     """
-    total = (
-        ProteinIntake.objects
-        .filter(user=user, intake_date=day)
-        .aggregate(total=Sum("protein_quantity_g"))
-        .get("total")
-    ) or 0
-
-    try:
-        target = DailyProteinTarget.objects.get(user=user, target_date=day)
-    except DailyProteinTarget.DoesNotExist:
-        return None, None
-
-    summary_obj, created = IntakeSummary.objects.update_or_create(
-        user=user,
-        summary_date=day,
-        defaults={
-            "total_protein_grams": total,
-            "target_protein_grams": target.target_grams,
-        },
-    )
-    return summary_obj, created
\ No newline at end of file
+    with transaction.atomic():
+        # Everything below is read under the user's stats lock, so concurrent upserts for the same
+        # user queue up and each sees the summary the previous one wrote as its `before`
+        lock_adherence_stats(user)
+        total = total_protein_for_user_date(user=user, day=day)
+
+        try:
+            target = DailyProteinTarget.objects.get(user=user, target_date=day)
+        except DailyProteinTarget.DoesNotExist:
+            return None, None
+
+        before = (
+            IntakeSummary.objects
+            .filter(user=user, summary_date=day)
+            .values_list("total_protein_cg", "target_protein_cg")
+            .first()
+        )
+        summary_obj, created = IntakeSummary.objects.update_or_create(
+            user=user,
+            summary_date=day,
+            defaults={
+                "total_protein_cg": total,
+                "target_protein_cg": target.target_cg,
+            },
+        )
+        apply_summary_change(
+            user=user,
+            day=day,
+            before=before,
+            after=(summary_obj.total_protein_cg, summary_obj.target_protein_cg),
+        )
+    return summary_obj, created
+
+
+def _on_target(values):
+    # values is a (total, target) pair, or None when there is no summary for the day
+    return values is not None and values[0] >= values[1]
+
+
+def _on_target_run(user, start, step):
+    """
+    Length of the run of consecutive on-target days starting at `start` and
+    walking one day at a time in direction `step` (+1 or -1).
+    """
+    qs = IntakeSummary.objects.filter(user=user)
+    if step < 0:
+        qs = qs.filter(summary_date__lte=start).order_by("-summary_date")
+    else:
+        qs = qs.filter(summary_date__gte=start).order_by("summary_date")
+
+    run = 0
+    expected = start
+    rows = qs.values_list("summary_date", "total_protein_cg", "target_protein_cg")
+    for day, total, target in rows.iterator(chunk_size=100):
+        if day != expected or total < target:
+            break
+        run += 1
+        expected += timedelta(days=step)
+    return run
+
+
+def _longest_on_target_run(user):
+    # Full scan of the user's history; only needed when the longest run may have been broken
+    longest = run = 0
+    previous = None
+    rows = (
+        IntakeSummary.objects
+        .filter(user=user)
+        .order_by("summary_date")
+        .values_list("summary_date", "total_protein_cg", "target_protein_cg")
+    )
+    for day, total, target in rows.iterator(chunk_size=500):
+        if total < target:
+            run = 0
+        elif previous is not None and day == previous + timedelta(days=1) and run:
+            run += 1
+        else:
+            run = 1
+        previous = day
+        longest = max(longest, run)
+    return longest
+
+
+def _refresh_current_streak(stats):
+    last = stats.last_summary_date
+    if last is None:
+        stats.run_before_last = stats.current_streak = 0
+        return
+    stats.run_before_last = _on_target_run(stats.user_id, last - timedelta(days=1), -1)
+    last_values = (
+        IntakeSummary.objects
+        .filter(user=stats.user_id, summary_date=last)
+        .values_list("total_protein_cg", "target_protein_cg")
+        .first()
+    )
+    stats.current_streak = stats.run_before_last + 1 if _on_target(last_values) else 0
+
+
+def _latest_summary_date(user, today):
+    # Summaries can exist for future days (generate-range); the streak and windows never count those
+    return (
+        IntakeSummary.objects
+        .filter(user=user, summary_date__lte=today)
+        .order_by("-summary_date")
+        .values_list("summary_date", flat=True)
+        .first()
+    )
+
+
+def _refresh_windows(stats, last=None):
+    # Bounded aggregate: at most 30 summary rows, whatever the length of the history.
+    # The windows end on `last`, by default the anchor.
+    last = last or stats.last_summary_date
+    if last is None:
+        window = {}
+    else:
+        in_7 = Q(summary_date__gt=last - timedelta(days=7))
+        hit = Q(total_protein_cg__gte=F("target_protein_cg"))
+        window = (
+            IntakeSummary.objects
+            .filter(user=stats.user_id, summary_date__gt=last - timedelta(days=30), summary_date__lte=last)
+            .aggregate(
+                total_30=Sum("total_protein_cg"),
+                days_30=Count("id"),
+                hits_30=Count("id", filter=hit),
+                total_7=Sum("total_protein_cg", filter=in_7),
+                days_7=Count("id", filter=in_7),
+                hits_7=Count("id", filter=in_7 & hit),
+            )
+        )
+    stats.window_7_total_cg = window.get("total_7") or 0
+    stats.window_7_days = window.get("days_7") or 0
+    stats.window_7_on_target = window.get("hits_7") or 0
+    stats.window_30_total_cg = window.get("total_30") or 0
+    stats.window_30_days = window.get("days_30") or 0
+    stats.window_30_on_target = window.get("hits_30") or 0
+
+
+def _rebuild_stats(stats):
+    user = stats.user_id
+    counts = IntakeSummary.objects.filter(user=user).aggregate(
+        days=Count("id"),
+        hits=Count("id", filter=Q(total_protein_cg__gte=F("target_protein_cg"))),
+    )
+    stats.days_tracked = counts["days"]
+    stats.days_on_target = counts["hits"]
+    stats.last_summary_date = _latest_summary_date(user, timezone.localdate())
+    _refresh_current_streak(stats)
+    stats.longest_streak = _longest_on_target_run(user)
+    _refresh_windows(stats)
+
+
+def _anchor_is_stale(stats, today):
+    # A summary written for a future day that has since arrived is a newer anchor
+    if stats.last_summary_date == today:
+        return False
+    summaries = IntakeSummary.objects.filter(user=stats.user_id, summary_date__lte=today)
+    if stats.last_summary_date is not None:
+        summaries = summaries.filter(summary_date__gt=stats.last_summary_date)
+    return summaries.exists()
+
+
+def lock_adherence_stats(user):
+    """
+    Lock the user's UserAdherenceStats row for the current transaction. A missing
+    row is created and built from the summaries as they are now, and a stale
+    anchor is moved up to today, so a change applied afterwards can be folded in
+    incrementally. Call it before writing the summary.
+    """
+    today = timezone.localdate()
+    stats, created = UserAdherenceStats.objects.select_for_update().get_or_create(user=user)
+    if created:
+        _rebuild_stats(stats)
+        stats.save()
+    elif _anchor_is_stale(stats, today):
+        # Totals and the longest streak don't depend on the anchor
+        stats.last_summary_date = _latest_summary_date(user, today)
+        _refresh_current_streak(stats)
+        _refresh_windows(stats)
+        stats.save()
+    return stats
+
+
+def current_adherence_stats(user):
+    """
+    The user's UserAdherenceStats as of today, for display; the changes below are not saved.
+
+    The stored streak and windows are anchored on the latest summary up to the
+    day of the last write. A current streak that doesn't reach yesterday is
+    over, and unless the anchor is today the windows are re-read for the 30
+    days ending today.
+    """
+    today = timezone.localdate()
+    stats = UserAdherenceStats.objects.filter(user=user).first()
+    if stats is None or _anchor_is_stale(stats, today):
+        with transaction.atomic():
+            stats = lock_adherence_stats(user)
+    if stats.last_summary_date != today:
+        if stats.last_summary_date is None or stats.last_summary_date < today - timedelta(days=1):
+            stats.current_streak = 0
+        _refresh_windows(stats, today)
+    return stats
+
+
+def apply_summary_change(*, user, day, before, after):
+    """
+    Fold one IntakeSummary change into the user's UserAdherenceStats.
+
+    before/after are (total, target) pairs for `day`, or None when the summary
+    did not exist before / no longer exists. Logging on the latest day (the
+    common case) is O(1); back-dated edits walk only the affected run. Days
+    after today count towards the totals only. The caller holds the lock from
+    lock_adherence_stats(), taken before the summary was written.
+    """
+    if before == after:
+        return
+
+    with transaction.atomic():
+        stats, created = UserAdherenceStats.objects.select_for_update().get_or_create(user=user)
+        # The stats row lock also serializes this user's rollup updates
+        _apply_rollup_delta(user=user, day=day, before=before, after=after)
+        if created:
+            # No stats yet (e.g. history from before stats existed): build them from scratch
+            _rebuild_stats(stats)
+            stats.save()
+            return
+
+        today = timezone.localdate()
+        was_hit = _on_target(before)
+        is_hit = _on_target(after)
+        old_last = stats.last_summary_date
+        old_current = stats.current_streak
+
+        stats.days_tracked += (after is not None) - (before is not None)
+        stats.days_on_target += is_hit - was_hit
+
+        if after is not None and day <= today and (old_last is None or day > old_last):
+            # Logging a new latest day: extend the current run if it touches yesterday
+            stats.last_summary_date = day
+            stats.run_before_last = old_current if old_last == day - timedelta(days=1) else 0
+            stats.current_streak = stats.run_before_last + 1 if is_hit else 0
+        elif day == old_last and after is not None:
+            stats.current_streak = stats.run_before_last + 1 if is_hit else 0
+        elif day == old_last:
+            # The latest summary was removed: fall back to the previous one
+            stats.last_summary_date = _latest_summary_date(user, today)
+            _refresh_current_streak(stats)
+        elif was_hit != is_hit and old_last is not None and day < old_last:
+            # Back-dated edit that flips a day: only the run around it can change
+            right = _on_target_run(user, day + timedelta(days=1), 1)
+            if day + timedelta(days=right) >= old_last - timedelta(days=1):
+                _refresh_current_streak(stats)
+
+        if was_hit != is_hit:
+            # Length of the run that contains `day` (after the change if it is now a hit, before if not)
+            if day in (old_last, stats.last_summary_date):
+                run = stats.current_streak if is_hit else old_current
+            else:
+                run = (
+                    _on_target_run(user, day - timedelta(days=1), -1) + 1
+                    + _on_target_run(user, day + timedelta(days=1), 1)
+                )
+            if is_hit:
+                stats.longest_streak = max(stats.longest_streak, run)
+            elif run >= stats.longest_streak:
+                # The longest run was broken; the next longest can be anywhere in the history
+                stats.longest_streak = _longest_on_target_run(user)
+
+        last = stats.last_summary_date
+        if last != old_last or (last is not None and last - timedelta(days=30) < day <= last):
+            _refresh_windows(stats)
+        stats.save()
+
+
+def rebuild_adherence_stats(user):
+    """
+    Recompute the user's UserAdherenceStats from scratch (backfill / repair).
+    """
+    with transaction.atomic():
+        stats, _ = UserAdherenceStats.objects.select_for_update().get_or_create(user=user)
+        _rebuild_stats(stats)
+        stats.save()
+    return stats
+
+
+ROLLUP_TRUNCATIONS = {IntakeRollup.WEEK: TruncWeek, IntakeRollup.MONTH: TruncMonth}
+
+
+def rollup_period(granularity, day):
+    """
+    (first, last) day of the week (Monday to Sunday) or calendar month containing day.
+    """
+    if granularity == IntakeRollup.WEEK:
+        first = day - timedelta(days=day.weekday())
+        return first, first + timedelta(days=6)
+    first = day.replace(day=1)
+    return first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def rebuild_rollups(*, user=None, start=None, end=None, granularities=tuple(ROLLUP_TRUNCATIONS), batch_size=1000):
+    """
+    Recompute IntakeRollup rows set-wise from IntakeSummary: one grouped
+    aggregate per granularity, written with bulk inserts. Limited to one user
+    and/or the periods overlapping [start, end] when given.
+    Returns the number of rollup rows written.
+    """
+    written = 0
+    for granularity in granularities:
+        trunc = ROLLUP_TRUNCATIONS[granularity]
+        summaries = IntakeSummary.objects.all()
+        rollups = IntakeRollup.objects.filter(granularity=granularity)
+        if user is not None:
+            summaries = summaries.filter(user=user)
+            rollups = rollups.filter(user=user)
+        if start is not None:
+            first = rollup_period(granularity, start)[0]
+            summaries = summaries.filter(summary_date__gte=first)
+            rollups = rollups.filter(period_start__gte=first)
+        if end is not None:
+            summaries = summaries.filter(summary_date__lte=rollup_period(granularity, end)[1])
+            rollups = rollups.filter(period_start__lte=end)
+
+        rows = (
+            summaries
+            .annotate(period=trunc("summary_date"))
+            .values("user_id", "period")
+            .annotate(
+                days=Count("id"),
+                hits=Count("id", filter=Q(total_protein_cg__gte=F("target_protein_cg"))),
+                total=Sum("total_protein_cg"),
+                target=Sum("target_protein_cg"),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            rollups.delete()
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(IntakeRollup(
+                    user_id=row["user_id"],
+                    granularity=granularity,
+                    period_start=row["period"],
+                    days_tracked=row["days"],
+                    days_on_target=row["hits"],
+                    total_protein_cg=row["total"],
+                    total_target_cg=row["target"],
+                ))
+                if len(batch) == batch_size:
+                    written += len(IntakeRollup.objects.bulk_create(batch))
+                    batch = []
+            written += len(IntakeRollup.objects.bulk_create(batch))
+    return written
+
+
+def _apply_rollup_delta(*, user, day, before, after):
+    """
+    Fold one IntakeSummary change into the week and month rollups containing day.
+    A missing rollup row (history from before rollups existed) is rebuilt from
+    its period's summaries instead, which already include the change.
+    """
+    days = (after is not None) - (before is not None)
+    hits = _on_target(after) - _on_target(before)
+    total = (after[0] if after else 0) - (before[0] if before else 0)
+    target = (after[1] if after else 0) - (before[1] if before else 0)
+
+    for granularity in ROLLUP_TRUNCATIONS:
+        first, last = rollup_period(granularity, day)
+        rollup = IntakeRollup.objects.filter(user=user, granularity=granularity, period_start=first)
+        changed = rollup.update(
+            days_tracked=F("days_tracked") + days,
+            days_on_target=F("days_on_target") + hits,
+            total_protein_cg=F("total_protein_cg") + total,
+            total_target_cg=F("total_target_cg") + target,
+        )
+        if not changed:
+            rebuild_rollups(user=user, start=first, end=last, granularities=[granularity])
+        elif days < 0:
+            # A period with no summaries left has no rollup
+            rollup.filter(days_tracked=0).delete()
+
+
+def _longest_run_overlapping(user, first, last):
+    """
+    Longest run of on-target days that overlaps [first, last], including the
+    parts of runs that cross either edge. Reads the span plus those runs only.
+    """
+    longest = run = _on_target_run(user, first - timedelta(days=1), -1)
+    previous = first - timedelta(days=1)
+    rows = (
+        IntakeSummary.objects
+        .filter(user=user, summary_date__gte=first)
+        .order_by("summary_date")
+        .values_list("summary_date", "total_protein_cg", "target_protein_cg")
+    )
+    for day, total, target in rows.iterator(chunk_size=100):
+        consecutive = day == previous + timedelta(days=1)
+        if day > last and not (run and consecutive and total >= target):
+            break
+        if total < target:
+            run = 0
+        else:
+            run = run + 1 if consecutive else 1
+        previous = day
+        longest = max(longest, run)
+    return longest
+
+
+def _sync_summary_targets(*, user, targets, target_cg):
+    """
+    Point the summaries of the given targets' dates at target_cg (one UPDATE),
+    then fold the change into the user's adherence stats and rollups.
+
+    Only days whose hit/miss flag flips touch the stats; streaks are re-walked
+    across the span of those days, not the whole history.
+    """
+    stats = lock_adherence_stats(user)
+    summaries = (
+        IntakeSummary.objects
+        .filter(user=user, summary_date__in=targets.values("target_date"))
+        .exclude(target_protein_cg=target_cg)
+    )
+    # Hit before and miss after, or the other way round
+    flips = list(
+        summaries
+        .filter(
+            Q(total_protein_cg__gte=F("target_protein_cg"), total_protein_cg__lt=target_cg)
+            | Q(total_protein_cg__lt=F("target_protein_cg"), total_protein_cg__gte=target_cg)
+        )
+        .values_list("summary_date", "total_protein_cg")
+    )
+    gained = sum(total >= target_cg for _, total in flips)
+    lost = len(flips) - gained
+    if flips:
+        first = min(day for day, _ in flips)
+        last = max(day for day, _ in flips)
+        longest_before = _longest_run_overlapping(user, first, last) if lost else 0
+
+    updated = summaries.update(target_protein_cg=target_cg)
+
+    if flips and stats.days_tracked == 0:
+        # The stats never saw these summaries (e.g. written in the admin): build them from scratch
+        _rebuild_stats(stats)
+        stats.save()
+    elif flips:
+        stats.days_on_target += gained - lost
+        if lost and longest_before >= stats.longest_streak:
+            # The longest run was broken; the next longest can be anywhere in the history
+            stats.longest_streak = _longest_on_target_run(user)
+        else:
+            # Runs outside the span are unchanged, so only the ones overlapping it can beat the old longest
+            stats.longest_streak = max(stats.longest_streak, _longest_run_overlapping(user, first, last))
+        anchor = stats.last_summary_date
+        # Flips after the anchor are future days, which the streak and windows don't count
+        if anchor is not None and last >= anchor - timedelta(days=stats.run_before_last + 1):
+            _refresh_current_streak(stats)
+        if anchor is not None and last > anchor - timedelta(days=30):
+            _refresh_windows(stats)
+        stats.save()
+
+    if updated:
+        span = targets.aggregate(first=Min("target_date"), last=Max("target_date"))
+        rebuild_rollups(user=user, start=span["first"], end=span["last"])
+    return updated
+
+
+def generate_targets_for_range(*, user, start, end):
+    """
+    Create or recompute the user's DailyProteinTarget for every day in [start, end]
+    with a single bulk upsert, and bring existing summaries in the range in line.
+    Returns (targets_written, summaries_updated).
+    """
+    target_cg = calculate_target_cg(user.weight_dag)
+    targets = [
+        DailyProteinTarget(
+            user=user,
+            target_date=start + timedelta(days=offset),
+            target_cg=target_cg,
+            calculation_method=TARGET_CALCULATION_METHOD,
+        )
+        for offset in range((end - start).days + 1)
+    ]
+    with transaction.atomic():
+        DailyProteinTarget.objects.bulk_create(
+            targets,
+            update_conflicts=True,
+            unique_fields=["user", "target_date"],
+            update_fields=["target_cg", "calculation_method"],
+        )
+        updated = _sync_summary_targets(
+            user=user,
+            targets=DailyProteinTarget.objects.filter(user=user, target_date__range=(start, end)),
+            target_cg=target_cg,
+        )
+    return len(targets), updated
+
+
+def recompute_future_targets(*, user, from_day):
+    """
+    After a weight change, recompute every weight-based target on or after
+    from_day, and the matching summaries, in set-based UPDATEs.
+    Returns (targets_updated, summaries_updated).
+    """
+    if user.weight_dag is None:
+        return 0, 0
+    target_cg = calculate_target_cg(user.weight_dag)
+    targets = DailyProteinTarget.objects.filter(
+        user=user, target_date__gte=from_day, calculation_method=TARGET_CALCULATION_METHOD
+    )
+    with transaction.atomic():
+        updated_targets = targets.exclude(target_cg=target_cg).update(target_cg=target_cg)
+        updated_summaries = _sync_summary_targets(user=user, targets=targets, target_cg=target_cg)
+    return updated_targets, updated_summaries
+
+
+def archive_intakes_before(*, cutoff, batch_size=1000):
+    """
+    Move ProteinIntake rows with intake_date < cutoff into ArchivedProteinIntake.
+    Each batch is copied and deleted in one transaction. IntakeSummary rows are
+    left untouched. Returns the number of rows moved.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                ProteinIntake.objects
+                .filter(intake_date__lt=cutoff)
+                .order_by("id")
+                .values("id", "user_id", "protein_source_id", "protein_quantity_cg", "intake_date", "created_at")[:batch_size]
+            )
+            if not rows:
+                break
+            # Raised before the rows leave the hot table, so no reader skips the archive for a day that is in it
+            _raise_archive_horizon(max(row["intake_date"] for row in rows))
+            ArchivedProteinIntake.objects.bulk_create([ArchivedProteinIntake(**row) for row in rows])
+            ProteinIntake.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        moved += len(rows)
+    return moved
@@ -0,0 +1,44 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.models import IntakeSummary
+
+User = get_user_model()
+
+class AdherenceRankTests(APITestCase):
+    def setUp(self):
+        # March adherence: u0 0%, u1 50%, u2 100%, u3 100%
+        self.users = []
+        for i, totals in enumerate([[1000, 1000], [6000, 1000], [6000, 7000], [9000]]):
+            user = User.objects.create_user(username=f"u{i}", email=f"u{i}@example.com", password="StrongPass123!")
+            for day, total in enumerate(totals, start=1):
+                IntakeSummary.objects.create(user=user, summary_date=date(2026, 3, day), total_protein_cg=total, target_protein_cg=5600)
+            self.users.append(user)
+
+    def test_rank_needs_a_refreshed_distribution(self):
+        self.client.login(username="u1", password="StrongPass123!")
+        resp = self.client.get("/api/me/adherence-rank/?month=2026-03")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rank_against_distribution(self):
+        call_command("refresh_adherence_distribution", "--month", "2026-03", "--chunk-size", "2", stdout=StringIO())
+
+        self.client.login(username="u1", password="StrongPass123!")
+        resp = self.client.get("/api/me/adherence-rank/?month=2026-03")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["adherence_percent"], "50.00")
+        self.assertEqual(resp.data["percentile"], "37.50")
+        self.assertEqual(resp.data["users_ranked"], 4)
+
+        self.client.login(username="u3", password="StrongPass123!")
+        resp = self.client.get("/api/me/adherence-rank/?month=2026-03")
+        self.assertEqual(resp.data["top_percent"], "25.00")
+
+    def test_invalid_month(self):
+        self.client.login(username="u1", password="StrongPass123!")
+        resp = self.client.get("/api/me/adherence-rank/?month=march")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
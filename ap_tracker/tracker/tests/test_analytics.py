@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.analytics import population_report
+from tracker.models import AnimalProteinSource, ProteinIntake, IntakeSummary
+
+User = get_user_model()
+
+class PopulationAnalyticsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(username="staff", email="s@example.com", password="StrongPass123!", is_staff=True)
+        self.u1 = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=5500)
+        self.u2 = User.objects.create_user(username="u2", email="u2@example.com", password="StrongPass123!", weight_dag=8500)
+        meat = AnimalProteinSource.objects.create(source_name="Beef", protein_per_100g="26.00", category="meat")
+        fish = AnimalProteinSource.objects.create(source_name="Cod", protein_per_100g="18.00", category="fish")
+
+        day = date(2026, 3, 1)
+        for user, source, grams in [(self.u1, meat, 1000), (self.u1, meat, 3000), (self.u2, fish, 2000), (self.u2, meat, 5000)]:
+            ProteinIntake.objects.create(user=user, protein_source=source, protein_quantity_cg=grams, intake_date=day)
+        IntakeSummary.objects.create(user=self.u1, summary_date=day, total_protein_cg=4000, target_protein_cg=4400)
+        IntakeSummary.objects.create(user=self.u2, summary_date=day, total_protein_cg=7000, target_protein_cg=6800)
+        IntakeSummary.objects.create(user=self.u2, summary_date=date(2026, 3, 2), total_protein_cg=8000, target_protein_cg=6800)
+
+    def test_staff_only(self):
+        self.client.login(username="u1", password="StrongPass123!")
+        resp = self.client.get("/api/analytics/population/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.login(username="staff", password="StrongPass123!")
+        resp = self.client.get("/api/analytics/population/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["intake_by_category"]["meat"]["total_grams"], 90.0)
+
+    def test_report_is_chunk_size_independent(self):
+        report = population_report(date(2026, 3, 1), date(2026, 3, 31), chunk_size=1, use_cache=False)
+
+        meat = report["intake_by_category"]["meat"]
+        self.assertEqual(meat["intakes"], 3)
+        self.assertEqual(meat["mean_grams"], 30.0)
+        self.assertEqual(report["intake_by_category"]["fish"]["total_grams"], 20.0)
+
+        adherence = report["target_adherence"]
+        self.assertEqual(adherence["user_days"], 3)
+        self.assertEqual(adherence["users_tracked"], 2)
+        self.assertEqual(adherence["users_on_target_most_days_percent"], 50.0)
+        self.assertEqual(adherence["user_adherence_distribution"]["0-10%"], 1)
+        self.assertEqual(adherence["user_adherence_distribution"]["90-100%"], 1)
+
+        bands = report["intake_by_weight_band"]
+        self.assertEqual(bands["50-60"]["mean_daily_grams"], 40.0)
+        self.assertEqual(bands["80-90"]["mean_daily_grams"], 75.0)
+
+        self.assertEqual(report, population_report(date(2026, 3, 1), date(2026, 3, 31), chunk_size=1000, use_cache=False))
+
+    def test_command_rejects_bad_end_date(self):
+        with self.assertRaisesMessage(CommandError, "Invalid date format"):
+            call_command("population_report", "--end", "bogus")
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.models import AnimalProteinSource, ProteinIntake, ArchivedProteinIntake, IntakeSummary
+from tracker.services import ARCHIVE_HORIZON_KEY, archive_horizon
+
+User = get_user_model()
+
+class ArchiveIntakesTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+        self.source = AnimalProteinSource.objects.create(source_name="Beef", protein_per_100g="26.00", category="meat")
+
+        self.old_day = timezone.localdate() - timedelta(days=400)
+        self.recent_day = timezone.localdate() - timedelta(days=3)
+        self.client.post("/api/targets/", {"target_date": str(self.old_day)}, format="json")
+        self.old = ProteinIntake.objects.create(user=self.user, protein_source=self.source, protein_quantity_cg=3000, intake_date=self.old_day)
+        self.recent = ProteinIntake.objects.create(user=self.user, protein_source=self.source, protein_quantity_cg=1250, intake_date=self.recent_day)
+        self.client.post(f"/api/summaries/generate/?date={self.old_day}")
+
+    def test_old_rows_move_to_archive_and_summary_is_kept(self):
+        call_command("archive_intakes", "--older-than", "365", stdout=StringIO())
+
+        self.assertFalse(ProteinIntake.objects.filter(id=self.old.id).exists())
+        self.assertTrue(ProteinIntake.objects.filter(id=self.recent.id).exists())
+        self.assertEqual(ArchivedProteinIntake.objects.get(id=self.old.id).protein_quantity_cg, 3000)
+        self.assertTrue(IntakeSummary.objects.filter(user=self.user, summary_date=self.old_day).exists())
+
+    def test_list_and_rebuild_read_archived_rows(self):
+        call_command("archive_intakes", "--older-than", "365", stdout=StringIO())
+
+        newer = ProteinIntake.objects.create(user=self.user, protein_source=self.source, protein_quantity_cg=500, intake_date=self.old_day + timedelta(days=1))
+        resp = self.client.get(f"/api/intakes/?start={self.old_day}&end={self.recent_day}")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        # Hot and archived rows come back in date order
+        self.assertEqual([row["id"] for row in resp.data], [self.old.id, newer.id, self.recent.id])
+
+        resp = self.client.get(f"/api/intakes/?date={self.recent_day}")
+        self.assertEqual([row["id"] for row in resp.data], [self.recent.id])
+
+        resp = self.client.post(f"/api/summaries/generate/?date={self.old_day}")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["total_protein_grams"], "30.00")
+
+    def test_dashboard_shows_archived_intakes(self):
+        call_command("archive_intakes", "--older-than", "365", stdout=StringIO())
+
+        resp = self.client.get(f"/api/dashboard/?date={self.old_day}")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in resp.data["intakes"]], [self.old.id])
+        self.assertEqual(resp.data["total_protein_grams"], "30.00")
+
+    def test_archive_table_is_skipped_after_the_horizon(self):
+        call_command("archive_intakes", "--older-than", "365", stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"/api/intakes/?date={self.recent_day}")
+            self.client.post("/api/intakes/", {
+                "protein_source": self.source.id, "protein_quantity_g": "10.00", "intake_date": str(self.recent_day),
+            }, format="json")
+        self.assertFalse([q for q in queries.captured_queries if "archivedproteinintake" in q["sql"]])
+
+    def test_horizon_fill_never_lowers_a_concurrent_raise(self):
+        cache.delete(ARCHIVE_HORIZON_KEY)
+        self.addCleanup(cache.delete, ARCHIVE_HORIZON_KEY)
+
+        def stale_aggregate(**kwargs):
+            # An archive run raises the horizon between our read of the table and the cache write
+            cache.set(ARCHIVE_HORIZON_KEY, self.recent_day, None)
+            return {"latest": self.old_day}
+
+        with patch.object(ArchivedProteinIntake.objects, "aggregate", side_effect=stale_aggregate):
+            self.assertEqual(archive_horizon(), self.recent_day)
+        self.assertEqual(cache.get(ARCHIVE_HORIZON_KEY), self.recent_day)
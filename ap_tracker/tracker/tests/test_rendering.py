@@ -0,0 +1,77 @@
+import gzip
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from tracker.middleware import brotli
+from tracker.models import AnimalProteinSource, ProteinIntake
+from tracker.renderers import FastJSONRenderer, orjson
+
+User = get_user_model()
+
+class FastJSONRendererTests(APITestCase):
+    def test_output_matches_stock_renderer(self):
+        data = {
+            "decimal": Decimal("12.50"),
+            "date": date(2026, 3, 1),
+            "datetime": datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            "naive": datetime(2026, 3, 1, 12, 30),
+            "text": "Crème fraîche   line",
+            "lazy": gettext_lazy("Not found."),
+            "nested": [{"n": 1, "f": 0.5, "none": None, "bool": True}],
+            1: "int key",
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipIf(orjson is None, "orjson not installed")
+    def test_documented_float_differences(self):
+        self.assertEqual(FastJSONRenderer().render({"f": 1e16}), b'{"f":1e16}')
+        self.assertEqual(FastJSONRenderer().render({"f": float("nan")}), b'{"f":null}')
+
+    def test_indent_uses_stock_renderer(self):
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+
+class CompressionMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+        source = AnimalProteinSource.objects.create(source_name="Eggs", protein_per_100g="13.00", category="dairy")
+        ProteinIntake.objects.bulk_create([
+            ProteinIntake(user=self.user, protein_source=source, protein_quantity_cg=1000, intake_date="2026-02-20")
+            for _ in range(100)
+        ])
+
+    def test_large_list_is_gzipped_when_accepted(self):
+        plain = self.client.get("/api/intakes/")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        resp = self.client.get("/api/intakes/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        self.assertEqual(gzip.decompress(resp.content), plain.content)
+
+    def test_small_response_is_not_compressed(self):
+        resp = self.client.get("/api/me/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+    @skipIf(brotli is None, "brotli not installed")
+    def test_brotli_preferred_when_accepted(self):
+        plain = self.client.get("/api/intakes/")
+        resp = self.client.get("/api/intakes/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(resp.content), plain.content)
+
+    @skipIf(brotli is None, "brotli not installed")
+    def test_html_is_never_brotli_compressed(self):
+        resp = self.client.get("/api/intakes/", HTTP_ACCEPT="text/html", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertTrue(resp["Content-Type"].startswith("text/html"))
+        self.assertEqual(resp["Content-Encoding"], "gzip")
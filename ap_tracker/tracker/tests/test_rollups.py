@@ -0,0 +1,109 @@
+import random
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.models import AnimalProteinSource, DailyProteinTarget, IntakeSummary, IntakeRollup
+from tracker.services import rebuild_rollups, generate_targets_for_range
+
+User = get_user_model()
+
+def snapshot(user):
+    return sorted(
+        IntakeRollup.objects.filter(user=user).values_list(
+            "granularity", "period_start", "days_tracked", "days_on_target", "total_protein_cg", "total_target_cg"
+        )
+    )
+
+class IntakeRollupTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+        self.source = AnimalProteinSource.objects.create(source_name="Tuna", protein_per_100g="29.00", category="fish")
+
+    def log(self, day, grams):
+        DailyProteinTarget.objects.get_or_create(
+            user=self.user, target_date=day, defaults={"target_cg": 5600, "calculation_method": "weight * 0.8"}
+        )
+        resp = self.client.post(
+            "/api/intakes/",
+            {"protein_source": self.source.id, "protein_quantity_g": grams, "intake_date": str(day)},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+    def test_trends_follow_logged_intakes(self):
+        # Sat 28 Feb .. Tue 3 Mar 2026: two weeks, two months
+        for day, grams in [(date(2026, 2, 28), "60.00"), (date(2026, 3, 1), "20.00"), (date(2026, 3, 2), "70.00"), (date(2026, 3, 3), "50.00")]:
+            self.log(day, grams)
+
+        resp = self.client.get("/api/summaries/trends/?granularity=week")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["period_start"] for row in resp.data], ["2026-02-23", "2026-03-02"])
+        self.assertEqual(resp.data[0]["days_tracked"], 2)
+        self.assertEqual(resp.data[0]["days_on_target"], 1)
+        self.assertEqual(resp.data[0]["total_protein_grams"], "80.00")
+        self.assertEqual(resp.data[0]["average_protein_grams"], "40.00")
+        self.assertEqual(resp.data[1]["total_target_grams"], "112.00")
+
+        resp = self.client.get("/api/summaries/trends/?granularity=month&start=2026-03-15")
+        self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["period_start"], "2026-03-01")
+        self.assertEqual(resp.data[0]["average_protein_grams"], "46.67")
+
+        resp = self.client.get("/api/summaries/trends/?granularity=year")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_incremental_rollups_match_rebuild(self):
+        rng = random.Random(7)
+        start = date(2026, 1, 1)
+        for offset in range(70):
+            DailyProteinTarget.objects.create(
+                user=self.user, target_date=start + timedelta(days=offset), target_cg=5600, calculation_method="weight * 0.8"
+            )
+        for _ in range(80):
+            summaries = list(IntakeSummary.objects.filter(user=self.user))
+            day = start + timedelta(days=rng.randrange(70))
+            op = rng.choice(["log", "log", "edit", "delete"]) if summaries else "log"
+            if op == "log":
+                self.log(day, f"{rng.randint(10, 60)}.00")
+            elif op == "edit":
+                summary = rng.choice(summaries)
+                body = {"total_protein_grams": f"{rng.randint(30, 90)}.00"}
+                if rng.random() < 0.3 and not IntakeSummary.objects.filter(user=self.user, summary_date=day).exists():
+                    body["summary_date"] = str(day)
+                resp = self.client.patch(f"/api/summaries/{summary.id}/", body, format="json")
+                self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            else:
+                resp = self.client.delete(f"/api/summaries/{rng.choice(summaries).id}/")
+                self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+
+            incremental = snapshot(self.user)
+            rebuild_rollups(user=self.user)
+            self.assertEqual(incremental, snapshot(self.user))
+
+    def test_weight_change_updates_rollup_targets(self):
+        today = date.today()
+        generate_targets_for_range(user=self.user, start=today, end=today + timedelta(days=3))
+        self.log(today, "60.00")
+        self.assertEqual(IntakeRollup.objects.get(user=self.user, granularity="month").days_on_target, 1)
+
+        resp = self.client.patch("/api/me/", {"weight_kg": "100.00"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        rollup = IntakeRollup.objects.get(user=self.user, granularity="month")
+        self.assertEqual(rollup.days_on_target, 0)
+        self.assertEqual(rollup.total_target_cg, 8000)
+
+    def test_backfill_command(self):
+        IntakeSummary.objects.create(user=self.user, summary_date=date(2026, 3, 2), total_protein_cg=6000, target_protein_cg=5600)
+        IntakeSummary.objects.create(user=self.user, summary_date=date(2026, 3, 9), total_protein_cg=4000, target_protein_cg=5600)
+        self.assertFalse(IntakeRollup.objects.exists())
+
+        out = StringIO()
+        call_command("backfill_rollups", stdout=out)
+        self.assertIn("Wrote 3 rollup row(s).", out.getvalue())
+        month = IntakeRollup.objects.get(user=self.user, granularity="month")
+        self.assertEqual((month.days_tracked, month.days_on_target, month.total_protein_cg), (2, 1, 10000))
@@ -0,0 +1,56 @@
+import json
+import tempfile
+
+import yaml
+from pathlib import Path
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tracker import schema
+
+class SchemaTests(APITestCase):
+    def setUp(self):
+        for cached in (schema._schema, schema._generated_schema):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    @override_settings(OPENAPI_SCHEMA_FILES={"yaml": "/nonexistent/openapi-schema.yaml", "json": "/nonexistent/openapi-schema.json"})
+    def test_schema_generated_once_and_revalidated_with_etag(self):
+        resp = self.client.get("/api/schema/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Content-Type"], "application/vnd.oai.openapi; charset=utf-8")
+        self.assertIn("/api/intakes/", yaml.safe_load(resp.content)["paths"])
+        etag = resp["ETag"]
+
+        resp = self.client.get("/api/schema/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # JSON is rendered from the same generated schema, with its own ETag
+        resp = self.client.get("/api/schema/?format=json")
+        self.assertEqual(resp["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertIn("/api/intakes/", json.loads(resp.content)["paths"])
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(schema._generated_schema.cache_info().misses, 1)
+        self.assertEqual(schema._schema.cache_info().misses, 2)
+
+    def test_format_negotiation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {"yaml": Path(tmp) / "openapi-schema.yaml", "json": Path(tmp) / "openapi-schema.json"}
+            files["yaml"].write_bytes(b"openapi: 3.0.3\npaths: {}\n")
+            files["json"].write_bytes(b'{"openapi": "3.0.3", "paths": {}}')
+            with override_settings(OPENAPI_SCHEMA_FILES=files):
+                default = self.client.get("/api/schema/")
+                by_accept = self.client.get("/api/schema/", HTTP_ACCEPT="application/json")
+                preferred = self.client.get("/api/schema/", HTTP_ACCEPT="application/json;q=0.5, application/yaml")
+                by_param = self.client.get("/api/schema/?format=json", HTTP_ACCEPT="application/yaml")
+                unknown = self.client.get("/api/schema/?format=xml")
+                not_acceptable = self.client.get("/api/schema/", HTTP_ACCEPT="text/csv")
+        self.assertEqual(default.content, b"openapi: 3.0.3\npaths: {}\n")
+        self.assertEqual(by_accept.content, b'{"openapi": "3.0.3", "paths": {}}')
+        self.assertEqual(by_accept["Content-Type"], "application/json")
+        self.assertEqual(preferred["Content-Type"], "application/yaml; charset=utf-8")
+        self.assertEqual(by_param.content, b'{"openapi": "3.0.3", "paths": {}}')
+        self.assertIn("Accept", default["Vary"])
+        self.assertEqual(unknown.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(not_acceptable.status_code, status.HTTP_406_NOT_ACCEPTABLE)
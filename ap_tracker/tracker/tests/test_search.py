@@ -0,0 +1,78 @@
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.models import AnimalProteinSource
+from tracker.search import SourceSearchIndex, _bump_version
+
+User = get_user_model()
+
+def names(rows):
+    return [row["source_name"] for row in rows]
+
+class SourceSearchIndexTests(APITestCase):
+    def setUp(self):
+        rows = [
+            {"id": 1, "source_name": "Chicken Breast", "category": "poultry", "protein_per_100g": "31.00"},
+            {"id": 2, "source_name": "Chicken", "category": "poultry", "protein_per_100g": "27.00"},
+            {"id": 3, "source_name": "Smoked Chicken Thigh", "category": "poultry", "protein_per_100g": "24.00"},
+            {"id": 4, "source_name": "Chickpea Flour Batter Fish", "category": "fish", "protein_per_100g": "12.00"},
+            {"id": 5, "source_name": "Salmon", "category": "fish", "protein_per_100g": "20.00"},
+            {"id": 6, "source_name": "Beef Mince", "category": "meat", "protein_per_100g": "26.00"},
+        ]
+        self.index = SourceSearchIndex(rows)
+
+    def test_ranking(self):
+        # Name prefixes (exact name first), then word prefixes
+        self.assertEqual(names(self.index.search("chicken")), ["Chicken", "Chicken Breast", "Smoked Chicken Thigh"])
+        self.assertEqual(names(self.index.search("chick"))[:2], ["Chicken", "Chicken Breast"])
+        self.assertEqual(names(self.index.search("chi th")), ["Smoked Chicken Thigh"])
+
+    def test_category_terms_and_filter(self):
+        self.assertEqual(names(self.index.search("fish")), ["Chickpea Flour Batter Fish", "Salmon"])
+        self.assertEqual(names(self.index.search("chick", category="FISH")), ["Chickpea Flour Batter Fish"])
+
+    def test_fuzzy_fallback_and_limit(self):
+        self.assertEqual(names(self.index.search("salmno")), ["Salmon"])
+        self.assertEqual(len(self.index.search("chick", limit=2)), 2)
+        self.assertEqual(self.index.search("  "), [])
+
+class SourceSearchEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!")
+        AnimalProteinSource.objects.create(source_name="Chicken Breast", protein_per_100g="31.00", category="poultry")
+        self.client.login(username="u1", password="StrongPass123!")
+
+    def test_search_and_invalidation_on_write(self):
+        resp = self.client.get("/api/sources/search/?q=chi")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(names(resp.data), ["Chicken Breast"])
+        self.assertEqual(resp.json()[0]["protein_per_100g"], "31.00")
+
+        source = AnimalProteinSource.objects.create(source_name="Chicken Liver", protein_per_100g="17.00", category="offal")
+        resp = self.client.get("/api/sources/search/?q=chi")
+        self.assertEqual(names(resp.data), ["Chicken Breast", "Chicken Liver"])
+
+        source.delete()
+        resp = self.client.get("/api/sources/search/?q=liver")
+        self.assertEqual(resp.data, [])
+
+    @override_settings(SOURCE_SEARCH_INDEX_TTL=0)
+    def test_ttl_rebuild_picks_up_bulk_writes(self):
+        self.client.get("/api/sources/search/?q=chi")
+        AnimalProteinSource.objects.bulk_create([AnimalProteinSource(source_name="Chives Omelette", protein_per_100g="10.00", category="eggs")])
+        resp = self.client.get("/api/sources/search/?q=chi")
+        self.assertIn("Chives Omelette", names(resp.data))
+
+    @override_settings(SOURCE_SEARCH_VERSION_CHECK_SECONDS=0)
+    def test_version_bump_from_another_worker_triggers_rebuild(self):
+        self.client.get("/api/sources/search/?q=chi")
+        # A bulk write sends no signal; the version key is what another worker's save would change
+        AnimalProteinSource.objects.bulk_create([AnimalProteinSource(source_name="Chives Omelette", protein_per_100g="10.00", category="eggs")])
+        _bump_version()
+        resp = self.client.get("/api/sources/search/?q=chi")
+        self.assertIn("Chives Omelette", names(resp.data))
+
+    def test_limit_validation(self):
+        resp = self.client.get("/api/sources/search/?q=chi&limit=500")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
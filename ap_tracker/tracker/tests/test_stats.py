@@ -0,0 +1,158 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from tracker.models import AnimalProteinSource, DailyProteinTarget, IntakeSummary, UserAdherenceStats
+from tracker.services import generate_targets_for_range, rebuild_adherence_stats
+
+User = get_user_model()
+
+STAT_FIELDS = [
+    "days_tracked", "days_on_target", "last_summary_date", "current_streak", "longest_streak", "run_before_last",
+    "window_7_total_cg", "window_7_days", "window_7_on_target",
+    "window_30_total_cg", "window_30_days", "window_30_on_target",
+]
+
+class AdherenceStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+        self.source = AnimalProteinSource.objects.create(source_name="Tuna", protein_per_100g="29.00", category="fish")
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=4)
+
+    def log(self, day, grams):
+        DailyProteinTarget.objects.get_or_create(
+            user=self.user, target_date=day, defaults={"target_cg": 5600, "calculation_method": "weight * 0.8"}
+        )
+        resp = self.client.post(
+            "/api/intakes/",
+            {"protein_source": self.source.id, "protein_quantity_g": grams, "intake_date": str(day)},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+    def test_stats_follow_logged_intakes(self):
+        for offset, grams in enumerate(["60.00", "56.00", "20.00", "70.00", "80.00"]):
+            self.log(self.start + timedelta(days=offset), grams)
+
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["as_of"], str(self.today))
+        self.assertEqual(resp.data["days_tracked"], 5)
+        self.assertEqual(resp.data["days_on_target"], 4)
+        self.assertEqual(resp.data["current_streak"], 2)
+        self.assertEqual(resp.data["longest_streak"], 2)
+        self.assertEqual(resp.data["adherence_percent"], "80.00")
+        self.assertEqual(resp.data["last_7_days"]["average_protein_grams"], "57.20")
+
+        # Topping up the missed day joins both runs into one
+        self.log(self.start + timedelta(days=2), "40.00")
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["current_streak"], 5)
+        self.assertEqual(resp.data["longest_streak"], 5)
+
+    def test_stats_are_built_on_first_request_for_existing_history(self):
+        IntakeSummary.objects.create(user=self.user, summary_date=self.today, total_protein_cg=6000, target_protein_cg=5600)
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["current_streak"], 1)
+        self.assertEqual(resp.data["last_30_days"]["adherence_percent"], "100.00")
+
+    def test_incremental_updates_match_full_rebuild(self):
+        rng = random.Random(26)
+        for _ in range(80):
+            # Some of these are future days
+            day = self.today - timedelta(days=rng.randrange(-10, 30))
+            existing = IntakeSummary.objects.filter(user=self.user, summary_date=day).first()
+            payload = {
+                "summary_date": str(day),
+                "total_protein_grams": rng.choice(["10.00", "50.00", "56.00", "90.00"]),
+                "target_protein_grams": "56.00",
+            }
+            if existing is None:
+                self.client.post("/api/summaries/", payload, format="json")
+            elif rng.random() < 0.3:
+                self.client.delete(f"/api/summaries/{existing.id}/")
+            else:
+                self.client.patch(f"/api/summaries/{existing.id}/", payload, format="json")
+
+            incremental = UserAdherenceStats.objects.values(*STAT_FIELDS).get(user=self.user)
+            rebuilt = UserAdherenceStats.objects.values(*STAT_FIELDS).get(pk=rebuild_adherence_stats(self.user).pk)
+            self.assertEqual(incremental, rebuilt)
+
+    def test_first_logged_intake_on_existing_history_matches_rebuild(self):
+        # No stats row yet: it is built under the lock before the new day is folded in, not counted twice
+        for offset in range(3):
+            IntakeSummary.objects.create(user=self.user, summary_date=self.start + timedelta(days=offset), total_protein_cg=6000, target_protein_cg=5600)
+        self.log(self.start + timedelta(days=3), "60.00")
+
+        incremental = UserAdherenceStats.objects.values(*STAT_FIELDS).get(user=self.user)
+        self.assertEqual(incremental["days_tracked"], 4)
+        self.assertEqual(incremental["current_streak"], 4)
+        rebuilt = UserAdherenceStats.objects.values(*STAT_FIELDS).get(pk=rebuild_adherence_stats(self.user).pk)
+        self.assertEqual(incremental, rebuilt)
+
+    def test_target_changes_match_full_rebuild(self):
+        rng = random.Random(30)
+        first_day = self.today - timedelta(days=45)
+        for offset in range(60):
+            if rng.random() < 0.9:
+                IntakeSummary.objects.create(
+                    user=self.user, summary_date=first_day + timedelta(days=offset),
+                    total_protein_cg=rng.choice([5000, 5600, 6000, 6400, 7000]), target_protein_cg=5600,
+                )
+        rebuild_adherence_stats(self.user)
+
+        for _ in range(25):
+            self.user.weight_dag = rng.choice([6000, 7000, 7500, 8000, 9000])
+            self.user.save(update_fields=["weight_dag"])
+            first = first_day + timedelta(days=rng.randrange(60))
+            last = first + timedelta(days=rng.randrange(20))
+            generate_targets_for_range(user=self.user, start=first, end=last)
+
+            incremental = UserAdherenceStats.objects.values(*STAT_FIELDS).get(user=self.user)
+            rebuilt = UserAdherenceStats.objects.values(*STAT_FIELDS).get(pk=rebuild_adherence_stats(self.user).pk)
+            self.assertEqual(incremental, rebuilt)
+
+    def test_future_summaries_do_not_move_the_anchor(self):
+        self.log(self.today, "60.00")
+        end = self.today + timedelta(days=20)
+        self.client.post(f"/api/targets/generate-range/?start={self.today}&end={end}")
+        resp = self.client.post(f"/api/summaries/generate-range/?start={self.today}&end={end}")
+        self.assertEqual(resp.data["updated"], 21)
+
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["as_of"], str(self.today))
+        self.assertEqual(resp.data["current_streak"], 1)
+        self.assertEqual(resp.data["last_7_days"]["days_tracked"], 1)
+        self.assertEqual(resp.data["last_7_days"]["average_protein_grams"], "60.00")
+        # Future days still count as tracked (and missed) in the totals
+        self.assertEqual(resp.data["days_tracked"], 21)
+
+        # Once tomorrow comes, its (empty) summary is the anchor
+        with mock.patch("django.utils.timezone.localdate", return_value=self.today + timedelta(days=1)):
+            resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["as_of"], str(self.today + timedelta(days=1)))
+        self.assertEqual(resp.data["current_streak"], 0)
+        self.assertEqual(resp.data["last_7_days"]["days_tracked"], 2)
+
+    def test_streak_and_windows_lapse_when_logging_stops(self):
+        for offset in range(3):
+            self.log(self.today - timedelta(days=12 - offset), "60.00")
+
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["as_of"], str(self.today - timedelta(days=10)))
+        self.assertEqual(resp.data["current_streak"], 0)
+        self.assertEqual(resp.data["longest_streak"], 3)
+        self.assertEqual(resp.data["last_7_days"]["days_tracked"], 0)
+        self.assertEqual(resp.data["last_30_days"]["days_tracked"], 3)
+
+        # A run ending yesterday is still current until today is over
+        self.log(self.today - timedelta(days=1), "60.00")
+        resp = self.client.get("/api/me/stats/")
+        self.assertEqual(resp.data["current_streak"], 1)
+        self.assertEqual(resp.data["last_7_days"]["days_tracked"], 1)
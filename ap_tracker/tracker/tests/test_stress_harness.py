@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+from tracker.models import AnimalProteinSource
+
+User = get_user_model()
+
+class StressHarnessTests(TransactionTestCase):
+    def test_sequential_run_reports_and_verifies_summaries(self):
+        out = StringIO()
+        call_command("stress_intakes", "--threads", "1", "--ops", "30", "--users", "2", "--seed", "3", "--force", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("30 requests from 1 thread(s)", output)
+        self.assertIn("error rate 0.0%", output)
+        self.assertIn("All summaries match the sum of their intakes.", output)
+        self.assertFalse(User.objects.filter(username__startswith="stress_").exists())
+        self.assertFalse(AnimalProteinSource.objects.filter(source_name="stress_source").exists())
+
+    def test_refuses_to_touch_existing_stress_users(self):
+        existing = User.objects.create_user(username="stress_0", email="real@example.com", password="StrongPass123!")
+        with self.assertRaisesMessage(CommandError, "stress_0 already exist"):
+            call_command("stress_intakes", "--threads", "1", "--ops", "5", "--force", stdout=StringIO())
+        self.assertTrue(User.objects.filter(pk=existing.pk).exists())
@@ -1,16 +1,54 @@
+from datetime import date, timedelta
+
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework import status
+from tracker.models import DailyProteinTarget, IntakeSummary
 
 User = get_user_model()
 
 class TargetTests(APITestCase):
     def setUp(self):
-        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_kg=70)
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
         self.client.login(username="u1", password="StrongPass123!")
 
     def test_target_auto_calculates_weight_times_point8(self):
         resp = self.client.post("/api/targets/", {"target_date": "2026-02-20"}, format="json")
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
         # 70 * 0.8 = 56
-        self.assertEqual(resp.data["target_grams"], "56.00")
\ No newline at end of file
+        self.assertEqual(resp.data["target_grams"], "56.00")
+
+    def test_generate_range_bulk_upserts_targets(self):
+        self.client.post("/api/targets/", {"target_date": "2026-03-10"}, format="json")
+        resp = self.client.post("/api/targets/generate-range/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["generated"], 31)
+
+        targets = DailyProteinTarget.objects.filter(user=self.user)
+        self.assertEqual(targets.count(), 31)
+        self.assertEqual(set(targets.values_list("target_cg", flat=True)), {5600})
+
+        resp = self.client.post("/api/targets/generate-range/?start=2026-03-31&end=2026-03-01")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_weight_change_recomputes_future_targets_and_summaries(self):
+        today = date.today()
+        past, future = today - timedelta(days=1), today + timedelta(days=1)
+        self.client.post(f"/api/targets/generate-range/?start={past}&end={future}")
+        for day in (past, future):
+            self.client.post("/api/summaries/", {
+                "summary_date": str(day), "total_protein_grams": "60.00", "target_protein_grams": "56.00",
+            }, format="json")
+
+        resp = self.client.patch("/api/me/", {"weight_kg": "80.00"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        targets = dict(DailyProteinTarget.objects.filter(user=self.user).values_list("target_date", "target_cg"))
+        self.assertEqual(targets[past], 5600)
+        self.assertEqual(targets[today], 6400)
+        self.assertEqual(targets[future], 6400)
+
+        summaries = dict(IntakeSummary.objects.filter(user=self.user).values_list("summary_date", "target_protein_cg"))
+        self.assertEqual(summaries[past], 5600)
+        self.assertEqual(summaries[future], 6400)
+        self.assertEqual(self.client.get("/api/me/stats/").data["days_on_target"], 1)
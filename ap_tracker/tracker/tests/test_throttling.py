@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+from tracker.throttling import TokenBucketThrottle
+
+User = get_user_model()
+
+class ThrottlingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+
+    @override_settings(THROTTLE_BUCKETS={"user": (100, 0.01), "endpoint": (40, 0.01)})
+    def test_heavy_action_drains_its_endpoint_bucket(self):
+        url = "/api/summaries/generate-range/?start=2026-03-01&end=2026-03-02"
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+
+        resp = self.client.post(url)
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", resp)
+
+        # Cheap calls on other endpoints still go through
+        self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
+
+    @override_settings(THROTTLE_BUCKETS={"user": (3, 0.01), "endpoint": (100, 0.01)})
+    def test_user_bucket_spans_endpoints(self):
+        self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/api/targets/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/api/summaries/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLE_BUCKETS={"user": (3, 0.01), "endpoint": (1, 0.01)})
+    def test_rejected_requests_do_not_drain_user_bucket(self):
+        self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
+        for _ in range(5):
+            self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # The endpoint bucket turned those away, so the user bucket still has 2 tokens
+        self.assertEqual(self.client.get("/api/targets/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/api/summaries/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/api/intakes/?date=2026-03-01").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_throttling_adds_no_queries(self):
+        # Session and user lookups only; the buckets never touch the database
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
+
+    def test_locked_bucket_rejects_instead_of_double_spending(self):
+        cache.add(f"throttle:user:user:{self.user.pk}:lock", 1, 60)
+        with patch.object(TokenBucketThrottle, "sleep"):
+            resp = self.client.get("/api/me/")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # The endpoint lock taken before giving up was released
+        self.assertIsNone(cache.get(f"throttle:endpoint:user:{self.user.pk}:MeView.get:lock"))
+
+
+class AdmissionControlTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7000)
+        self.client.login(username="u1", password="StrongPass123!")
+
+    @override_settings(ADMISSION_DB_LATENCY_MS=0.000001, ADMISSION_DB_LATENCY_HALF_LIFE=3600)
+    def test_slow_database_sheds_load(self):
+        self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
+
+        resp = self.client.get("/api/me/")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp["Retry-After"], "2")
+
+        # Non-API paths are never shed
+        self.assertNotEqual(self.client.get("/").status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @override_settings(ADMISSION_MAX_IN_FLIGHT=0, ADMISSION_DB_LATENCY_MS=0)
+    def test_disabled_checks_admit_everything(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get("/api/me/").status_code, status.HTTP_200_OK)
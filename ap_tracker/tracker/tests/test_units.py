@@ -0,0 +1,88 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from tracker.models import AnimalProteinSource, ProteinIntake, DailyProteinTarget
+from tracker.units import to_hundredths, format_hundredths, div_round
+
+User = get_user_model()
+
+class FixedPointTests(APITestCase):
+    def test_conversions_are_exact(self):
+        self.assertEqual(to_hundredths("12.34"), 1234)
+        self.assertEqual(to_hundredths(70), 7000)
+        with self.assertRaises(ValueError):
+            to_hundredths("1.234")
+        self.assertEqual([format_hundredths(v) for v in (0, 5, 1234, 100000, -5590)], ["0.00", "0.05", "12.34", "1000.00", "-55.90"])
+        # Half to even, like Decimal.quantize
+        self.assertEqual([div_round(n, 2) for n in (1, 3, 5, -3)], [0, 2, 2, -2])
+
+class CentigramStorageTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7055)
+        self.client.login(username="u1", password="StrongPass123!")
+        self.source = AnimalProteinSource.objects.create(source_name="Tuna", protein_per_100g="29.00", category="fish")
+
+    def test_api_keeps_two_decimal_strings(self):
+        resp = self.client.get("/api/me/")
+        self.assertEqual(resp.json()["weight_kg"], "70.55")
+
+        resp = self.client.post(
+            "/api/intakes/", {"protein_source": self.source.id, "protein_quantity_g": "12.3", "intake_date": "2026-03-01"}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.json()["protein_quantity_g"], "12.30")
+        self.assertEqual(ProteinIntake.objects.get().protein_quantity_cg, 1230)
+
+        for bad in ("1.234", "1000.00", "-1.00"):
+            resp = self.client.post(
+                "/api/intakes/", {"protein_source": self.source.id, "protein_quantity_g": bad, "intake_date": "2026-03-01"}, format="json"
+            )
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_daily_summary_above_999_grams(self):
+        self.client.post("/api/targets/", {"target_date": "2026-03-01"}, format="json")
+        self.assertEqual(DailyProteinTarget.objects.get().target_cg, 5644)
+        for _ in range(3):
+            ProteinIntake.objects.create(user=self.user, protein_source=self.source, protein_quantity_cg=99999, intake_date=date(2026, 3, 1))
+
+        resp = self.client.post("/api/summaries/generate/?date=2026-03-01")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()["total_protein_grams"], "2999.97")
+        self.assertEqual(resp.json()["target_protein_grams"], "56.44")
+
+    def test_bench_aggregates_output_matches(self):
+        out = StringIO()
+        call_command("bench_aggregates", "--rows", "200", "--repeat", "1", "--force", stdout=out)
+        self.assertIn("Identical API output: True", out.getvalue())
+        self.assertFalse(User.objects.filter(username="bench_aggregates").exists())
+
+class AdminUnitsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="StrongPass123!")
+        self.client.login(username="admin", password="StrongPass123!")
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="StrongPass123!", weight_dag=7055)
+        self.source = AnimalProteinSource.objects.create(source_name="Tuna", protein_per_100g="29.00", category="fish")
+
+    def test_admin_edits_grams_and_kilograms(self):
+        resp = self.client.get(f"/admin/tracker/user/{self.user.pk}/change/")
+        self.assertContains(resp, 'value="70.55"')
+
+        intake = ProteinIntake.objects.create(user=self.user, protein_source=self.source, protein_quantity_cg=1234, intake_date=date(2026, 3, 1))
+        url = f"/admin/tracker/proteinintake/{intake.pk}/change/"
+        self.assertContains(self.client.get(url), 'value="12.34"')
+        data = {"user": self.user.pk, "protein_source": self.source.pk, "intake_date": "2026-03-01"}
+        resp = self.client.post(url, {**data, "protein_quantity_cg": "45.60"})
+        self.assertEqual(resp.status_code, status.HTTP_302_FOUND)
+        intake.refresh_from_db()
+        self.assertEqual(intake.protein_quantity_cg, 4560)
+
+        # Limits match the API: 2 decimal places, up to 999.99 g per intake
+        for bad in ("1.234", "1000.00", "-1.00"):
+            resp = self.client.post(url, {**data, "protein_quantity_cg": bad})
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        intake.refresh_from_db()
+        self.assertEqual(intake.protein_quantity_cg, 4560)
@@ -0,0 +1,132 @@
+"""
+Cache-backed token-bucket throttles.
+
+Each bucket holds up to `capacity` tokens and refills at `refill_rate` tokens
+per second (settings.THROTTLE_BUCKETS[scope]). A request spends its cost in
+tokens, so heavy actions drain a bucket faster than cheap reads. A view sets
+its costs with `get_throttle_cost(request)` or a `throttle_costs` dict keyed
+by action (viewsets) or lower-case HTTP method (APIViews); the default is 1.
+
+Buckets live in the Django cache (settings.CACHES). With Redis or Memcached
+every worker process draws on the same tokens; with the default per-process
+LocMemCache each worker has its own buckets. Each bucket is locked with
+`cache.add` while it is read and written back, so concurrent requests cannot
+both spend the same tokens.
+"""
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from rest_framework.throttling import BaseThrottle
+
+
+def get_throttle_cost(request, view):
+    if hasattr(view, "get_throttle_cost"):
+        return view.get_throttle_cost(request)
+    key = getattr(view, "action", None) or request.method.lower()
+    return getattr(view, "throttle_costs", {}).get(key, 1)
+
+
+class BucketBusy(Exception):
+    pass
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Admits a request only when every bucket from get_buckets() holds enough
+    tokens, then charges it to all of them. A rejected request costs nothing.
+    """
+    cache = default_cache
+    timer = time.time
+    sleep = time.sleep
+
+    # A lock left behind by a crashed worker expires after lock_timeout seconds
+    lock_timeout = 5
+    lock_attempts = 50
+    lock_retry_delay = 0.01
+
+    def get_buckets(self, request, view):
+        """
+        (scope, cache key) pairs this request pays into; empty to skip throttling. Must be overridden.
+        """
+        raise NotImplementedError(".get_buckets() must be overridden")
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    @contextmanager
+    def locked(self, keys):
+        held = []
+        try:
+            # Always locked in the same order, so two requests never hold one bucket each and wait on the other
+            for key in sorted(keys):
+                lock_key = f"{key}:lock"
+                for _ in range(self.lock_attempts):
+                    if self.cache.add(lock_key, 1, self.lock_timeout):
+                        break
+                    self.sleep(self.lock_retry_delay)
+                else:
+                    raise BucketBusy(key)
+                held.append(lock_key)
+            yield
+        finally:
+            if held:
+                self.cache.delete_many(held)
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request, view)
+        if not buckets:
+            return True
+
+        cost = get_throttle_cost(request, view)
+        try:
+            with self.locked([key for _, key in buckets]):
+                now = self.timer()
+                stored = self.cache.get_many([key for _, key in buckets])
+                levels = []
+                for scope, key in buckets:
+                    # Read at request time so buckets can be tuned (or overridden in tests) without a restart
+                    capacity, refill_rate = settings.THROTTLE_BUCKETS[scope]
+                    tokens, updated = stored.get(key, (capacity, now))
+                    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+                    levels.append((key, tokens, capacity, refill_rate))
+
+                waits = [(cost - tokens) / refill_rate for _, tokens, _, refill_rate in levels if tokens < cost]
+                if waits:
+                    # Nothing is written back, so the buckets that had room keep their tokens
+                    self.wait_seconds = max(waits)
+                    return False
+
+                for key, tokens, capacity, refill_rate in levels:
+                    # An idle bucket is full again after capacity / refill_rate seconds, so it can expire then
+                    self.cache.set(key, (tokens - cost, now), math.ceil(capacity / refill_rate))
+        except BucketBusy:
+            # Only a burst of concurrent requests from the same client keeps a bucket locked this long
+            self.wait_seconds = self.lock_timeout
+            return False
+
+        self.wait_seconds = None
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserEndpointTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Two buckets per request:
+    - "user": one per user (per client IP when anonymous) across the whole API
+    - "endpoint": one per user per endpoint/action, so one heavy action cannot use up the whole user budget
+    """
+
+    def get_buckets(self, request, view):
+        ident = self.get_ident_for(request)
+        endpoint = f"{view.__class__.__name__}.{getattr(view, 'action', None) or request.method.lower()}"
+        return [
+            ("user", f"throttle:user:{ident}"),
+            ("endpoint", f"throttle:endpoint:{ident}:{endpoint}"),
+        ]
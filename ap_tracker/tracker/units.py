@@ -0,0 +1,35 @@
+"""
+Fixed-point helpers for quantities stored as integer hundredths.
+
+Gram amounts are stored in centigrams (12.34 g -> 1234) and body weight in
+hundredths of a kg (70.55 kg -> 7055), so sums and comparisons in the
+database and in Python are plain integer arithmetic. Values only become
+two-decimal strings at the API boundary (serializers.HundredthsField).
+"""
+from decimal import Decimal
+
+
+def to_hundredths(value):
+    """
+    Exact conversion of a 2-decimal-place value ("12.34", Decimal, int) to an int (1234).
+    Raises ValueError if the value has more than 2 decimal places.
+    """
+    scaled = Decimal(str(value)).scaleb(2)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{value!r} has more than 2 decimal places")
+    return int(scaled)
+
+
+def format_hundredths(value):
+    # 1234 -> "12.34", -5 -> "-0.05"; same output as format(Decimal, ".2f") without building a Decimal
+    sign = "-" if value < 0 else ""
+    whole, part = divmod(abs(value), 100)
+    return f"{sign}{whole}.{part:02d}"
+
+
+def div_round(numerator, denominator):
+    # Integer division rounded half to even, like Decimal.quantize under the default context
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
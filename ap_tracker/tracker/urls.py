@@ -17,7 +17,7 @@ Including another URLconf
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import MeView, RegisterView, DashboardView
+from .views import MeView, MeStatsView, AdherenceRankView, RegisterView, DashboardView, PopulationAnalyticsView
 from .views import ProteinIntakeViewSet, AnimalProteinSourceViewSet, DailyProteinTargetViewSet, IntakeSummaryViewSet
 
 
@@ -29,8 +29,11 @@ router.register(r"summaries", IntakeSummaryViewSet, basename="summaries")
 
 urlpatterns = [
     path("me/", MeView.as_view(), name="me"),
+    path("me/stats/", MeStatsView.as_view(), name="me-stats"),
+    path("me/adherence-rank/", AdherenceRankView.as_view(), name="me-adherence-rank"),
     path("register/", RegisterView.as_view(), name="register"),
     path("dashboard/", DashboardView.as_view(), name="dashboard"),
+    path("analytics/population/", PopulationAnalyticsView.as_view(), name="analytics-population"),
 ]
 
 urlpatterns += router.urls
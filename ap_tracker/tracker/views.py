@@ -1,15 +1,22 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, SAFE_METHODS, AllowAny
-from .models import AnimalProteinSource, ProteinIntake, DailyProteinTarget, IntakeSummary
+from .models import AnimalProteinSource, ProteinIntake, DailyProteinTarget, IntakeSummary, ArchivedProteinIntake
+from .models import AdherenceDistribution, IntakeRollup
 from .serializers import AnimalProteinSourceSerializer, ProteinIntakeSerializer, DailyProteinTargetSerializer, IntakeSummarySerializer
+from .serializers import ArchivedProteinIntakeSerializer, IntakeRollupSerializer
 from .permissions import IsOwner
-from decimal import Decimal
+from .search import get_index
 from rest_framework.exceptions import ValidationError
-from .services import upsert_intake_summary_for_user_date
-
-from datetime import date as date_class
+from .services import upsert_intake_summary_for_user_date, total_protein_for_user_date, is_archived_range
+from .services import apply_summary_change, current_adherence_stats, lock_adherence_stats, rollup_period
+from .services import calculate_target_cg, generate_targets_for_range, recompute_future_targets, TARGET_CALCULATION_METHOD
+from .units import div_round, format_hundredths
+
+import heapq
+from datetime import date as date_class, datetime, timedelta
+from operator import itemgetter
+from django.db import transaction
 from django.utils.dateparse import parse_date
-from django.db.models import Sum
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
@@ -24,6 +31,12 @@ class ProteinIntakeViewSet(viewsets.ModelViewSet):
     serializer_class = ProteinIntakeSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_throttle_cost(self, request):
+        # An unfiltered list returns the whole history (archived rows included)
+        if self.action == "list" and not request.query_params.keys() & {"date", "start", "end"}:
+            return 5
+        return 1
+
     def get_queryset(self):
         # Users can only see their own protein intake records
         return ProteinIntake.objects.filter(user=self.request.user)
@@ -49,17 +62,22 @@ class ProteinIntakeViewSet(viewsets.ModelViewSet):
         upsert_intake_summary_for_user_date(user=self.request.user, day=day)
 
     def get_queryset(self):
-        qs = ProteinIntake.objects.filter(user=self.request.user)
+        return self.filter_by_date_params(ProteinIntake.objects.filter(user=self.request.user))
 
+    def date_params(self):
+        """
+        Validated (date, start, end) from the query string; each is None when not given.
+        start and end only count when both are given.
+        """
         date_str = self.request.query_params.get("date")
         start = self.request.query_params.get("start")
         end = self.request.query_params.get("end")
 
+        d = s = e = None
         if date_str:
             d = parse_date(date_str)
             if not d:
                 raise ValidationError({"date": "Invalid format. Use YYYY-MM-DD."})
-            qs = qs.filter(intake_date=d)
 
         if start and end:
             s = parse_date(start)
@@ -68,10 +86,29 @@ class ProteinIntakeViewSet(viewsets.ModelViewSet):
                 raise ValidationError({"range": "Invalid date format. Use YYYY-MM-DD."})
             if s > e:
                 raise ValidationError({"range": "start must be <= end."})
-            qs = qs.filter(intake_date__range=(s, e))
 
+        return d, s, e
+
+    def filter_by_date_params(self, qs):
+        d, s, e = self.date_params()
+        if d:
+            qs = qs.filter(intake_date=d)
+        if s:
+            qs = qs.filter(intake_date__range=(s, e))
         return qs
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by("intake_date", "id")
+        data = self.get_serializer(queryset, many=True).data
+
+        # Old rows live in the archive table; only read it when the range starts on or before the archive horizon
+        d, s, _ = self.date_params()
+        if is_archived_range(max(filter(None, (d, s)), default=None)):
+            archived = self.filter_by_date_params(ArchivedProteinIntake.objects.filter(user=request.user))
+            archived_data = ArchivedProteinIntakeSerializer(archived.order_by("intake_date", "id"), many=True).data
+            data = list(heapq.merge(archived_data, data, key=itemgetter("intake_date", "id")))
+        return Response(data)
+
 
 class AnimalProteinSourceViewSet(viewsets.ModelViewSet):
     queryset = AnimalProteinSource.objects.all()
@@ -82,11 +119,40 @@ class AnimalProteinSourceViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
+    # Upper bound for search results per request
+    MAX_SEARCH_LIMIT = 50
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        GET /api/sources/search/?q=chick&category=meat&limit=10
+        Ranked autocomplete over source name and category, served from the in-memory index.
+        """
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        if not 1 <= limit <= self.MAX_SEARCH_LIMIT:
+            raise ValidationError({"limit": f"Must be between 1 and {self.MAX_SEARCH_LIMIT}."})
+
+        results = get_index().search(
+            request.query_params.get("q", ""),
+            category=request.query_params.get("category"),
+            limit=limit,
+        )
+        return Response(results)
+
 
 class DailyProteinTargetViewSet(viewsets.ModelViewSet):
     serializer_class = DailyProteinTargetSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    # Upper bound for generate-range (a year of targets per request)
+    MAX_RANGE_DAYS = 366
+
+    # Token cost per action for tracker.throttling (default 1)
+    throttle_costs = {"generate_range": 10}
+
     def get_queryset(self):
         return DailyProteinTarget.objects.filter(user=self.request.user)
 
@@ -94,16 +160,55 @@ class DailyProteinTargetViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         # Ensure user has weight
-        if user.weight_kg is None:
+        if user.weight_dag is None:
             raise ValidationError({"weight_kg": "Set your weight first (PATCH /api/me/) to calculate target."})
 
-        # Formula: weight * 0.8
-        target = Decimal(str(user.weight_kg)) * Decimal("0.8")
-
         serializer.save(
             user=user,
-            target_grams=target,
-            calculation_method="weight * 0.8"
+            target_cg=calculate_target_cg(user.weight_dag),
+            calculation_method=TARGET_CALCULATION_METHOD
+        )
+
+    @action(detail=False, methods=["post"], url_path="generate-range")
+    def generate_range(self, request):
+        """
+        POST /api/targets/generate-range/?start=YYYY-MM-DD&end=YYYY-MM-DD
+
+        Creates (or recomputes) one target per day in the range in a single bulk upsert.
+        """
+        start_raw = request.query_params.get("start")
+        end_raw = request.query_params.get("end")
+
+        if not start_raw or not end_raw:
+            return Response(
+                {"detail": "Missing required query parameters: start and end (YYYY-MM-DD)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start = parse_date(start_raw)
+        end = parse_date(end_raw)
+        if not start or not end:
+            return Response(
+                {"detail": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start > end:
+            return Response(
+                {"detail": "start must be <= end."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days >= self.MAX_RANGE_DAYS:
+            return Response(
+                {"detail": f"Range too long. At most {self.MAX_RANGE_DAYS} days per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.user.weight_dag is None:
+            raise ValidationError({"weight_kg": "Set your weight first (PATCH /api/me/) to calculate target."})
+
+        generated, summaries_updated = generate_targets_for_range(user=request.user, start=start, end=end)
+        return Response(
+            {"generated": generated, "summaries_updated": summaries_updated},
+            status=status.HTTP_200_OK
         )
 
 
@@ -111,11 +216,54 @@ class IntakeSummaryViewSet(viewsets.ModelViewSet):
     serializer_class = IntakeSummarySerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    # Token cost per action for tracker.throttling (default 1)
+    throttle_costs = {"generate": 2, "generate_range": 20}
+
     def get_queryset(self):
         return IntakeSummary.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            lock_adherence_stats(self.request.user)
+            obj = serializer.save(user=self.request.user)
+            apply_summary_change(
+                user=self.request.user, day=obj.summary_date,
+                before=None, after=(obj.total_protein_cg, obj.target_protein_cg)
+            )
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Re-read the row under the stats lock so a concurrent write cannot leave us a stale `before`
+            lock_adherence_stats(self.request.user)
+            serializer.instance.refresh_from_db()
+            old_date = serializer.instance.summary_date
+            before = (serializer.instance.total_protein_cg, serializer.instance.target_protein_cg)
+
+            obj = serializer.save()
+            after = (obj.total_protein_cg, obj.target_protein_cg)
+
+            # Keep adherence stats in step; a moved summary leaves its old date empty
+            if obj.summary_date == old_date:
+                apply_summary_change(user=self.request.user, day=old_date, before=before, after=after)
+            else:
+                apply_summary_change(user=self.request.user, day=old_date, before=before, after=None)
+                apply_summary_change(user=self.request.user, day=obj.summary_date, before=None, after=after)
+
+    def perform_destroy(self, instance):
+        day = instance.summary_date
+        with transaction.atomic():
+            lock_adherence_stats(self.request.user)
+            before = (
+                IntakeSummary.objects
+                .filter(pk=instance.pk)
+                .values_list("total_protein_cg", "target_protein_cg")
+                .first()
+            )
+            if before is None:
+                # Already deleted by a concurrent request, which updated the stats
+                return
+            instance.delete()
+            apply_summary_change(user=self.request.user, day=day, before=before, after=None)
 
     @action(detail=False, methods=["post"], url_path="generate")
     def generate(self, request):
@@ -138,33 +286,14 @@ class IntakeSummaryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 1) Sum protein intake for the day
-        total = (
-            ProteinIntake.objects
-            .filter(user=request.user, intake_date=summary_date)
-            .aggregate(total=Sum("protein_quantity_g"))
-            .get("total")
-        ) or 0
-
-        # 2) Fetch daily target for the day
-        try:
-            target = DailyProteinTarget.objects.get(user=request.user, target_date=summary_date)
-        except DailyProteinTarget.DoesNotExist:
+        # Sum the day's intake (hot + archived) and upsert the summary row (idempotent)
+        summary_obj, _created = upsert_intake_summary_for_user_date(user=request.user, day=summary_date)
+        if summary_obj is None:
             return Response(
                 {"detail": "No daily protein target found for this date."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 3) Upsert summary row (idempotent)
-        summary_obj, _created = IntakeSummary.objects.update_or_create(
-            user=request.user,
-            summary_date=summary_date,
-            defaults={
-                "total_protein_grams": total,
-                "target_protein_grams": target.target_grams,
-            }
-        )
-
         serializer = self.get_serializer(summary_obj)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -211,6 +340,40 @@ class IntakeSummaryViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=["get"])
+    def trends(self, request):
+        """
+        GET /api/summaries/trends/?granularity=week|month&start=YYYY-MM-DD&end=YYYY-MM-DD
+
+        Per-week (Monday start) or per-month totals, averages and days on target,
+        read from the precomputed IntakeRollup rows. start/end are optional and
+        select the periods overlapping that range.
+        """
+        granularity = request.query_params.get("granularity", IntakeRollup.WEEK)
+        if granularity not in dict(IntakeRollup.GRANULARITY_CHOICES):
+            return Response(
+                {"detail": "granularity must be 'week' or 'month'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rollups = IntakeRollup.objects.filter(user=request.user, granularity=granularity).order_by("period_start")
+        for param in ("start", "end"):
+            raw = request.query_params.get(param)
+            if raw is None:
+                continue
+            day = parse_date(raw)
+            if not day:
+                return Response(
+                    {"detail": "Invalid date format. Use YYYY-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if param == "start":
+                rollups = rollups.filter(period_start__gte=rollup_period(granularity, day)[0])
+            else:
+                rollups = rollups.filter(period_start__lte=day)
+
+        return Response(IntakeRollupSerializer(rollups, many=True).data, status=status.HTTP_200_OK)
+
 
 
 class MeView(APIView):
@@ -221,14 +384,132 @@ class MeView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def patch(self, request):
+        old_weight = request.user.weight_dag
         serializer = MeSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            user = serializer.save()
+            # Today's and future weight-based targets (and their summaries) follow the new weight
+            if user.weight_dag != old_weight:
+                recompute_future_targets(user=user, from_day=date_class.today())
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
 
+class MeStatsView(APIView):
+    """
+    GET /api/me/stats/
+
+    Streaks, rolling 7/30-day windows and adherence for the authenticated user
+    as of today, served from the materialized UserAdherenceStats row.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        stats = current_adherence_stats(request.user)
+
+        def percent(part, whole):
+            # In hundredths of a percent, so it formats like the gram values
+            return format_hundredths(div_round(part * 10000, whole)) if whole else None
+
+        def window(total_cg, days, on_target):
+            return {
+                "days_tracked": days,
+                "days_on_target": on_target,
+                "average_protein_grams": format_hundredths(div_round(total_cg, days)) if days else None,
+                "adherence_percent": percent(on_target, days),
+            }
+
+        return Response(
+            {
+                "as_of": str(stats.last_summary_date) if stats.last_summary_date else None,
+                "days_tracked": stats.days_tracked,
+                "days_on_target": stats.days_on_target,
+                "adherence_percent": percent(stats.days_on_target, stats.days_tracked),
+                "current_streak": stats.current_streak,
+                "longest_streak": stats.longest_streak,
+                "last_7_days": window(stats.window_7_total_cg, stats.window_7_days, stats.window_7_on_target),
+                "last_30_days": window(stats.window_30_total_cg, stats.window_30_days, stats.window_30_on_target),
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class AdherenceRankView(APIView):
+    """
+    GET /api/me/adherence-rank/?month=YYYY-MM
+
+    Where the user's adherence for the month ranks among all users, looked up
+    in the precomputed AdherenceDistribution (see refresh_adherence_distribution).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        month_raw = request.query_params.get("month")
+        if month_raw:
+            try:
+                period_start = datetime.strptime(month_raw, "%Y-%m").date()
+            except ValueError:
+                return Response({"detail": "Invalid month format. Use YYYY-MM."},
+                                status=status.HTTP_400_BAD_REQUEST)
+        else:
+            period_start = date_class.today().replace(day=1)
+
+        # Deferred: tracker.analytics pulls in NumPy, which most workers never need
+        from .analytics import user_adherence, adherence_percentile
+
+        distribution = AdherenceDistribution.objects.filter(period_start=period_start).first()
+        if distribution is None or not distribution.users:
+            return Response({"detail": "No adherence ranking available for this month yet."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        days, hits = user_adherence(request.user, period_start)
+        if not days:
+            return Response({"detail": "No summaries for this month."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        adherence = 100 * hits / days
+        percentile = adherence_percentile(distribution, adherence)
+        return Response(
+            {
+                "month": f"{period_start:%Y-%m}",
+                "adherence_percent": format(adherence, ".2f"),
+                "percentile": format(percentile, ".2f"),
+                "top_percent": format(100 - percentile, ".2f"),
+                "users_ranked": distribution.users,
+                "refreshed_at": distribution.refreshed_at,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class PopulationAnalyticsView(APIView):
+    """
+    GET /api/analytics/population/?start=YYYY-MM-DD&end=YYYY-MM-DD
+
+    Staff-only cross-user report: intake by source category, target adherence
+    and intake by weight band. Defaults to the last 30 days; cached per window.
+    """
+    permission_classes = [IsAdminUser]
+    throttle_costs = {"get": 20}
+
+    def get(self, request):
+        end_raw = request.query_params.get("end")
+        start_raw = request.query_params.get("start")
+        end = parse_date(end_raw) if end_raw else date_class.today()
+        start = parse_date(start_raw) if start_raw else (end - timedelta(days=29) if end else None)
+        if not start or not end:
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({"detail": "start must be <= end."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        from .analytics import population_report  # deferred NumPy import, see AdherenceRankView
+
+        return Response(population_report(start, end), status=status.HTTP_200_OK)
+
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -248,33 +529,31 @@ class DashboardView(APIView):
 
         # Target
         target_obj = DailyProteinTarget.objects.filter(user=request.user, target_date=day).first()
-        target_grams = str(target_obj.target_grams) if target_obj else None
+        target_grams = format_hundredths(target_obj.target_cg) if target_obj else None
 
         # Total
         if summary:
-            total = summary.total_protein_grams
+            total = summary.total_protein_cg
         else:
-            total = (
-                ProteinIntake.objects.filter(user=request.user, intake_date=day)
-                .aggregate(total=Sum("protein_quantity_g"))
-                .get("total")
-            ) or 0
+            total = total_protein_for_user_date(user=request.user, day=day)
 
         remaining = None
         if target_obj:
-            remaining = target_obj.target_grams - total
+            remaining = target_obj.target_cg - total
 
         intakes = ProteinIntake.objects.filter(user=request.user, intake_date=day).order_by("-created_at")
-        intakes_data = ProteinIntakeSerializer(intakes, many=True).data
+        intakes_data = list(ProteinIntakeSerializer(intakes, many=True).data)
+        if is_archived_range(day):
+            # Archived rows were all logged before the archive run, so they come after the hot ones
+            archived = ArchivedProteinIntake.objects.filter(user=request.user, intake_date=day).order_by("-created_at")
+            intakes_data += ArchivedProteinIntakeSerializer(archived, many=True).data
 
-        def fmt2(value):
-            return format(Decimal(value), ".2f")
         return Response(
             {
                 "date": str(day),
                 "target_grams": target_grams,
-                "total_protein_grams": fmt2(total),
-                "remaining_grams": fmt2(remaining) if remaining is not None else None,
+                "total_protein_grams": format_hundredths(total),
+                "remaining_grams": format_hundredths(remaining) if remaining is not None else None,
                 "intakes": intakes_data,
             },
             status=status.HTTP_200_OK